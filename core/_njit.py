@@ -0,0 +1,26 @@
+"""
+core/_njit.py
+-------------
+Optional Numba JIT.
+
+Kernels are decorated with `njit` from here instead of importing numba
+directly. When numba is not installed the decorator is a no-op and the
+kernel runs as plain Python, so callers should check HAVE_NUMBA before
+preferring a scalar loop over an equivalent NumPy expression.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(fn):
+            return fn
+
+        return decorator
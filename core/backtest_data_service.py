@@ -1,31 +1,53 @@
 # core/backtest_data_service.py
 
+import os
+import hashlib
 import pandas as pd
 from datetime import datetime, timedelta
+from functools import lru_cache
+from sqlalchemy import select, func, cast, BigInteger
 from core.logger_service import get_logger
-from core.db import SessionLocal
+from core.db import SessionLocal, engine
 from db.models.market_prices import MarketPrice
 from core.ingest_engine import IngestionEngine
-from core.indicator_service import IndicatorService
+from core.indicator_service import IndicatorService, INDICATOR_VERSION
 
 logger = get_logger("backtest_data_service")
 
+# Rows fetched per round-trip from the server-side cursor
+LOAD_CHUNK_SIZE = 50_000
 
+# On-disk cache of loaded + indicator-enriched frames
+CACHE_DIR = os.path.join("data", "cache", "backtest")
+
+
+_DURATION_UNITS = {
+    "D": timedelta(days=1),
+    "W": timedelta(weeks=1),
+    "M": timedelta(days=30),
+    "Y": timedelta(days=365),
+}
+
+
+@lru_cache(maxsize=64)
 def parse_duration_str(s: str) -> timedelta:
-    value, unit = s.strip().split()
-    value = int(value)
-    unit = unit.upper()
+    try:
+        value, unit = s.split()
+        return _DURATION_UNITS[unit.upper()] * int(value)
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid duration: {s}") from None
 
-    if unit == "D":
-        return timedelta(days=value)
-    if unit == "W":
-        return timedelta(weeks=value)
-    if unit == "M":
-        return timedelta(days=value * 30)
-    if unit == "Y":
-        return timedelta(days=value * 365)
 
-    raise ValueError(f"Invalid duration: {s}")
+def _cache_path(symbol: str, resolution: str, duration, fingerprint) -> str:
+    """
+    Cache key includes a fingerprint of the bars in the loaded window (see
+    BacktestDataService._fingerprint) and INDICATOR_VERSION, so new,
+    backfilled or corrected bars and indicator changes all invalidate the
+    entry automatically.
+    """
+    raw = f"{symbol}|{resolution}|{duration}|{fingerprint}|v{INDICATOR_VERSION}"
+    key = hashlib.sha1(raw.encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
 
 
 class BacktestDataService:
@@ -41,63 +63,217 @@ class BacktestDataService:
             .count()
         )
 
+    # ------------------------------------------------------------------
+    def has_any(self, symbol: str, resolution: str) -> bool:
+        """
+        EXISTS probe — stops at the first matching index entry instead of
+        counting every row like get_row_count.
+        """
+        return self.session.query(
+            self.session.query(MarketPrice)
+            .filter_by(symbol=symbol, resolution=resolution)
+            .exists()
+        ).scalar()
+
     # ------------------------------------------------------------------
     def ensure_data(self, symbol: str, resolution: str, auto_fetch: bool, duration: str):
-        count = self.get_row_count(symbol, resolution)
-        logger.info(f"Backtest data check: found {count} rows for {symbol} @ {resolution}.")
+        if self.has_any(symbol, resolution):
+            logger.info(f"Backtest data check: rows present for {symbol} @ {resolution}.")
+            return
+
+        logger.info(f"Backtest data check: no rows for {symbol} @ {resolution}.")
 
-        if count == 0 and auto_fetch:
+        if auto_fetch:
             ingest = IngestionEngine()
             ingest.run(symbol, resolution, duration)
             ingest.close()
 
     # ------------------------------------------------------------------
-    def load_prices(self, symbol: str, resolution: str, auto_fetch=False, duration="1 Y"):
+    def load_prices(self, symbol: str, resolution: str, auto_fetch=False, duration="1 Y",
+                    use_cache=True):
         self.ensure_data(symbol, resolution, auto_fetch, duration)
 
-        rows = (
-            self.session.query(MarketPrice)
+        max_ts = (
+            self.session.query(func.max(MarketPrice.ts))
             .filter_by(symbol=symbol, resolution=resolution)
-            .order_by(MarketPrice.ts.asc())
-            .all()
+            .scalar()
         )
-
-        if not rows:
+        if max_ts is None:
             raise ValueError(f"No price rows for {symbol} @ {resolution}")
 
-        df = pd.DataFrame(
-            [
-                {
-                    "date": r.ts,
-                    "ts": r.ts,
-                    "open": r.open,
-                    "high": r.high,
-                    "low": r.low,
-                    "close": r.close,
-                    "volume": r.volume,
-                }
-                for r in rows
-            ]
+        # Resolve the duration cutoff up front so slicing happens in SQL
+        # (an index range scan) rather than after loading the full history.
+        cutoff = max_ts - parse_duration_str(duration) if duration else None
+
+        if use_cache:
+            fingerprint = self._fingerprint(symbol, resolution, cutoff, max_ts)
+            cache_path = _cache_path(symbol, resolution, duration, fingerprint)
+            if os.path.exists(cache_path):
+                try:
+                    df = pd.read_parquet(cache_path)
+                    logger.info(f"Loaded {len(df)} cached rows for {symbol} @ {resolution} ← {cache_path}")
+                    return df
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable backtest cache {cache_path}: {e}")
+
+        # Core select streamed through a server-side cursor: rows arrive in
+        # typed chunks and no ORM instances are ever built.
+        stmt = (
+            select(
+                MarketPrice.ts,
+                MarketPrice.open,
+                MarketPrice.high,
+                MarketPrice.low,
+                MarketPrice.close,
+                MarketPrice.volume,
+            )
+            .where(
+                MarketPrice.symbol == symbol,
+                MarketPrice.resolution == resolution,
+            )
+            .order_by(MarketPrice.ts.asc())
         )
+        if cutoff is not None:
+            stmt = stmt.where(MarketPrice.ts >= cutoff)
+
+        with engine.connect().execution_options(stream_results=True) as conn:
+            chunks = list(
+                pd.read_sql_query(
+                    stmt, conn, chunksize=LOAD_CHUNK_SIZE, parse_dates=["ts"]
+                )
+            )
+
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+        if df.empty:
+            raise ValueError(f"No price rows for {symbol} @ {resolution}")
 
         logger.info(
             f"BacktestDataService.load_prices → {symbol} @ {resolution}: "
-            f"{len(df)} rows before slicing"
+            f"{len(df)} rows (duration={duration}, cutoff >= {cutoff})"
         )
 
-        # Duration slicing
-        if duration:
-            window = parse_duration_str(duration)
-            cutoff = df["ts"].max() - window
-            df = df[df["ts"] >= cutoff]
-            logger.info(
-                f"Sliced to duration {duration}: {len(df)} rows remaining "
-                f"(cutoff >= {cutoff})"
+        df = self._prepare_frame(df)
+
+        if use_cache:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                df.to_parquet(cache_path, compression="zstd")
+            except Exception as e:
+                logger.warning(f"Could not write backtest cache {cache_path}: {e}")
+
+        return df
+
+    # ------------------------------------------------------------------
+    def _fingerprint(self, symbol: str, resolution: str, cutoff, max_ts) -> str:
+        """
+        Fingerprint of the bars load_prices reads (ts >= cutoff), from one
+        aggregate over that window only.
+
+        Row count and min ts change when bars are appended or backfilled
+        into the window; the sums change when a bar is corrected in place
+        by an upsert. Prices are summed as integers (1e-4 units) so the
+        result is exact and does not depend on aggregation order, unlike a
+        float SUM under a parallel plan.
+        """
+        stmt = select(
+            func.count(),
+            func.min(MarketPrice.ts),
+            func.sum(cast(func.round(MarketPrice.close * 10000), BigInteger)),
+            func.sum(cast(func.round(MarketPrice.volume), BigInteger)),
+        ).where(
+            MarketPrice.symbol == symbol,
+            MarketPrice.resolution == resolution,
+        )
+        if cutoff is not None:
+            stmt = stmt.where(MarketPrice.ts >= cutoff)
+
+        count, min_ts, close_sum, volume_sum = self.session.execute(stmt).one()
+        return f"{count}|{min_ts.isoformat()}|{max_ts.isoformat()}|{close_sum}|{volume_sum}"
+
+    # ------------------------------------------------------------------
+    def load_prices_many(self, symbols, resolution: str, duration="1 Y"):
+        """
+        Load several symbols in one pass: a single GROUP BY for the newest
+        bar per symbol, then a single symbol IN (...) query split in Python.
+
+        Returns {symbol: df} with the same frame layout as load_prices.
+        Symbols without rows are left out (and logged).
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        max_rows = (
+            self.session.query(MarketPrice.symbol, func.max(MarketPrice.ts))
+            .filter(
+                MarketPrice.symbol.in_(symbols),
+                MarketPrice.resolution == resolution,
             )
+            .group_by(MarketPrice.symbol)
+            .all()
+        )
+        max_ts = dict(max_rows)
 
-        df = df.reset_index(drop=True)
+        missing = [s for s in symbols if s not in max_ts]
+        if missing:
+            logger.warning(f"No price rows @ {resolution} for: {', '.join(missing)}")
+        if not max_ts:
+            return {}
 
-        # In-memory indicators
-        df = self.indicator_service.compute_indicators_df(df)
+        span = parse_duration_str(duration) if duration else None
+        cutoffs = {s: ts - span for s, ts in max_ts.items()} if span else {}
 
-        return df
+        stmt = (
+            select(
+                MarketPrice.symbol,
+                MarketPrice.ts,
+                MarketPrice.open,
+                MarketPrice.high,
+                MarketPrice.low,
+                MarketPrice.close,
+                MarketPrice.volume,
+            )
+            .where(
+                MarketPrice.symbol.in_(list(max_ts)),
+                MarketPrice.resolution == resolution,
+            )
+            .order_by(MarketPrice.symbol, MarketPrice.ts.asc())
+        )
+        # Coarse bound in SQL; the exact per-symbol cutoff is applied below
+        if cutoffs:
+            stmt = stmt.where(MarketPrice.ts >= min(cutoffs.values()))
+
+        with engine.connect().execution_options(stream_results=True) as conn:
+            chunks = list(
+                pd.read_sql_query(
+                    stmt, conn, chunksize=LOAD_CHUNK_SIZE, parse_dates=["ts"]
+                )
+            )
+
+        if not chunks:
+            return {}
+        all_rows = pd.concat(chunks, ignore_index=True)
+
+        frames = {}
+        for symbol, group in all_rows.groupby("symbol", sort=False):
+            if symbol in cutoffs:
+                group = group[group["ts"] >= cutoffs[symbol]]
+            frames[symbol] = self._prepare_frame(group.drop(columns="symbol"))
+
+        logger.info(
+            f"BacktestDataService.load_prices_many → {len(frames)} symbols @ {resolution}: "
+            f"{len(all_rows)} rows (duration={duration})"
+        )
+
+        return frames
+
+    # ------------------------------------------------------------------
+    def _prepare_frame(self, df):
+        """
+        Shape a raw OHLCV frame for the runner: date column, sequential
+        index and in-memory indicators.
+        """
+        df = df.reset_index(drop=True)
+        df.insert(0, "date", df["ts"])
+        return self.indicator_service.compute_indicators_df(df)
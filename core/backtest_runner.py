@@ -9,6 +9,80 @@ from core.backtest_data_service import BacktestDataService
 logger = get_logger("backtest_runner")
 
 
+def signals_to_positions(signals) -> np.ndarray:
+    """
+    Forward-fill a +1 (BUY) / -1 (SELL) / 0 signal vector into a 0/1 position
+    vector, matching the bar-by-bar loop semantics without iterating.
+    """
+    signals = np.asarray(signals, dtype=np.int8)
+    last = np.where(signals != 0, np.arange(len(signals)), 0)
+    np.maximum.accumulate(last, out=last)
+    return (signals[last] > 0).astype(np.int8)
+
+
+def compute_returns(close, position):
+    """
+    Per-bar buy & hold and strategy returns as raw float64 arrays
+    (equivalent to close.pct_change().fillna(0) and return * position).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    returns = np.zeros_like(close)
+    np.divide(close[1:], close[:-1], out=returns[1:])
+    returns[1:] -= 1.0
+    returns[np.isnan(returns)] = 0.0
+
+    # Cast the int8 position inside the ufunc loop instead of materialising
+    # a float64 copy first
+    strategy_returns = np.multiply(returns, position, dtype=np.float64)
+    return returns, strategy_returns
+
+
+# Annualisation fallback when the bars' calendar span is unknown
+TRADING_DAYS_PER_YEAR = 252
+
+
+def summarise_returns(returns, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Total return, max drawdown, annualised Sharpe and annualised Sortino,
+    computed directly on the NumPy buffer. returns may be one stream or a
+    2-D stack of streams (one per row), in which case each statistic is an
+    array per row.
+
+    Max drawdown is equity-based: the deepest fall of the compounded
+    equity curve below its running peak (a negative fraction, 0 if none).
+    Sortino uses the downside deviation sqrt(mean(min(r, 0)^2)).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    annualise = np.sqrt(periods_per_year)
+
+    equity = np.cumprod(1.0 + returns, axis=-1)
+    peak = np.maximum.accumulate(equity, axis=-1)
+
+    total = equity[..., -1] - 1.0
+    max_dd = (equity / peak - 1.0).min(axis=-1)
+
+    mean = returns.mean(axis=-1)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2, axis=-1))
+    sharpe = annualise * mean / (returns.std(axis=-1, ddof=1) + 1e-12)
+    sortino = annualise * mean / (downside + 1e-12)
+    return total, max_dd, sharpe, sortino
+
+
+def span_years(dates):
+    """Calendar length of a date column in years (365.25-day years)."""
+    if len(dates) < 2:
+        return 0.0
+    span = pd.Timestamp(dates.iloc[-1]) - pd.Timestamp(dates.iloc[0])
+    return span.total_seconds() / (365.25 * 86400)
+
+
+def cagr(total_return, years):
+    """Compound annual growth rate for a total return earned over years."""
+    if years <= 0:
+        return float("nan")
+    return (1.0 + total_return) ** (1.0 / years) - 1.0
+
+
 class BacktestRunner:
     def __init__(
         self,
@@ -19,6 +93,7 @@ class BacktestRunner:
         fetch_duration="1 Y",
         no_fetch=False,
         plot_mode=None,
+        data_service=None,
         **strategy_kwargs,
     ):
         self.symbol = symbol
@@ -35,14 +110,19 @@ class BacktestRunner:
             f"strategy={strategy_name}, auto_fetch={auto_fetch}, fetch_duration={fetch_duration}"
         )
 
-        # DB + indicators
-        self.data_service = BacktestDataService()
+        # DB + indicators (pass one in to share a session across many runners)
+        self.data_service = data_service or BacktestDataService()
 
         # Instantiate chosen strategy
         self.strategy = load_strategy(strategy_name, **strategy_kwargs)
 
     # ----------------------------------------------------------------------
-    def run(self):
+    def run(self, df=None):
+        """
+        Run the backtest. A frame already loaded via
+        BacktestDataService.load_prices_many can be passed as df to skip
+        the per-symbol DB load.
+        """
         logger.info(
             f"Starting DB-backed backtest: {self.symbol} @ {self.resolution} "
             f"(strategy={self.strategy_name}, auto_fetch={self.auto_fetch}, "
@@ -50,60 +130,72 @@ class BacktestRunner:
         )
 
         # --------------------------------------------------------------
-        # 1. Load raw DB data (OHLCV only, no indicators)
+        # 1. Load DB data (sequential index, indicators computed in memory)
         # --------------------------------------------------------------
-        df = self.data_service.load_prices(
-            self.symbol,
-            self.resolution,
-            auto_fetch=self.auto_fetch,
-            duration=self.duration,
-        )
+        if df is None:
+            df = self.data_service.load_prices(
+                self.symbol,
+                self.resolution,
+                auto_fetch=self.auto_fetch,
+                duration=self.duration,
+            )
 
         # --------------------------------------------------------------
-        # 2. Compute indicators IN MEMORY (no DB writes)
+        # 2. Strategy execution (vectorised signals, else bar-by-bar)
         # --------------------------------------------------------------
-        df = self.data_service.indicator_service.compute_indicators_df(df)
+        signals = self.strategy.compute_signals(df)
 
-        # Ensure sequential integer index
-        df = df.reset_index(drop=True)
+        if signals is not None:
+            logger.info(f"Using vectorised signals from strategy={self.strategy_name}.")
+            df["position"] = signals_to_positions(signals)
+        else:
+            self.strategy.on_start(df)
 
-        # --------------------------------------------------------------
-        # 3. Strategy execution bar-by-bar
-        # --------------------------------------------------------------
-        positions = []
-        current_position = 0
+            positions = np.zeros(len(df), dtype=np.int8)
+            current_position = 0
+            columns = list(df.columns)
 
-        for i in range(len(df)):
-            row = df.iloc[i]
-            signal = self.strategy.on_bar(i, row, df)
+            # itertuples yields plain tuples; zipping into a dict keeps the
+            # row["col"] / row.get("col") access strategies rely on without
+            # building a pandas Series per bar like df.iloc[i] does.
+            for i, values in enumerate(df.itertuples(index=False, name=None)):
+                row = dict(zip(columns, values))
+                signal = self.strategy.on_bar(i, row, df)
 
-            if signal == "BUY":
-                current_position = 1
-            elif signal == "SELL":
-                current_position = 0
+                if signal == "BUY":
+                    current_position = 1
+                elif signal == "SELL":
+                    current_position = 0
 
-            positions.append(current_position)
+                positions[i] = current_position
 
-        df["position"] = positions
+            df["position"] = positions
 
         logger.info(
             f"Generated positions: {df['position'].sum()} bar-long equivalents across {len(df)} bars."
         )
 
         # --------------------------------------------------------------
-        # 4. Compute returns
+        # 3. Compute returns
         # --------------------------------------------------------------
-        df["return"] = df["close"].pct_change().fillna(0)
-        df["strategy_return"] = df["return"] * df["position"]
-
-        strat_total = (1 + df["strategy_return"]).prod() - 1
-        buyhold_total = (1 + df["return"]).prod() - 1
+        returns, strategy_returns = compute_returns(
+            df["close"].to_numpy(), df["position"].to_numpy()
+        )
+        df["return"] = returns
+        df["strategy_return"] = strategy_returns
 
-        strat_dd = df["strategy_return"].cumsum().min()
-        buyhold_dd = df["return"].cumsum().min()
+        # Annualise with this frame's own bar frequency (1h and 1d differ)
+        years = span_years(df["date"])
+        periods_per_year = len(df) / years if years > 0 else TRADING_DAYS_PER_YEAR
 
-        strat_sharpe = df["strategy_return"].mean() / (df["strategy_return"].std() + 1e-12)
-        buyhold_sharpe = df["return"].mean() / (df["return"].std() + 1e-12)
+        # Strategy and buy & hold in one pass over a (2, bars) stack
+        totals, dds, sharpes, sortinos = summarise_returns(
+            np.vstack([strategy_returns, returns]), periods_per_year
+        )
+        strat_total, buyhold_total = totals.tolist()
+        strat_dd, buyhold_dd = dds.tolist()
+        strat_sharpe, buyhold_sharpe = sharpes.tolist()
+        strat_sortino, buyhold_sortino = sortinos.tolist()
 
         logger.info(
             f"Backtest results for {self.symbol}: "
@@ -112,7 +204,7 @@ class BacktestRunner:
         )
 
         # --------------------------------------------------------------
-        # 5. Plotting (simple or full)
+        # 4. Plotting (simple or full)
         # --------------------------------------------------------------
         if self.plot_mode:
             from core.plot_service import PlotService
@@ -126,14 +218,17 @@ class BacktestRunner:
             )
 
         # --------------------------------------------------------------
-        # 6. Return stats
+        # 5. Return stats
         # --------------------------------------------------------------
         return {
             "bars": len(df),
+            "years": years,
             "total_return": strat_total,
             "buyhold_return": buyhold_total,
             "sharpe": strat_sharpe,
             "buyhold_sharpe": buyhold_sharpe,
+            "sortino": strat_sortino,
+            "buyhold_sortino": buyhold_sortino,
             "max_dd": strat_dd,
             "buyhold_dd": buyhold_dd,
         }
@@ -0,0 +1,132 @@
+# core/contract_cache.py
+"""
+Qualified IBKR contracts, cached in memory and in a small SQLite file so
+that qualifyContracts() (an IBKR round-trip) runs once per contract
+rather than once per process.
+
+Cache file: CONTRACT_CACHE_PATH (default ~/.algo-trader/contracts.db).
+Entries older than CONTRACT_CACHE_TTL seconds (default 7 days) are
+re-qualified, so a conId that changed (ticker change, delisting) is not
+used for orders indefinitely.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import dataclasses
+from contextlib import closing
+from threading import Lock
+from ib_insync import Contract
+from core.logger_service import get_logger
+
+logger = get_logger("contract_cache")
+
+CONTRACT_CACHE_PATH = os.getenv(
+    "CONTRACT_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".algo-trader", "contracts.db"),
+)
+
+CONTRACT_CACHE_TTL = float(os.getenv("CONTRACT_CACHE_TTL", 7 * 24 * 3600))
+
+_DDL = (
+    "CREATE TABLE IF NOT EXISTS contracts "
+    "(key TEXT PRIMARY KEY, conId INTEGER, json TEXT, cached_at REAL)"
+)
+
+# A missing / unwritable cache location (OSError from makedirs or the
+# open) is treated like a SQLite failure: fall back to qualifying
+_CACHE_ERRORS = (sqlite3.Error, OSError)
+
+# (symbol, sec_type, exchange, currency) -> Contract, for this process
+_memory = {}
+_lock = Lock()
+
+
+def _connect():
+    os.makedirs(os.path.dirname(CONTRACT_CACHE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(CONTRACT_CACHE_PATH)
+    conn.execute(_DDL)
+
+    # Files created before entries had a timestamp: add the column; their
+    # rows have NULL cached_at and are re-qualified on first use
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(contracts)")}
+    if "cached_at" not in columns:
+        conn.execute("ALTER TABLE contracts ADD COLUMN cached_at REAL")
+    return conn
+
+
+def _to_json(contract) -> str:
+    # Only populated scalar fields; combo legs etc. do not apply to the
+    # contracts cached here
+    fields = {
+        k: v for k, v in dataclasses.asdict(contract).items()
+        if isinstance(v, (str, int, float)) and v not in ("", 0, 0.0)
+    }
+    return json.dumps(fields, sort_keys=True)
+
+
+def _load(key_str: str):
+    """Cached Contract for key_str, or None if absent, expired or without a conId."""
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute(
+                "SELECT conId, json, cached_at FROM contracts WHERE key = ?", (key_str,)
+            ).fetchone()
+    except _CACHE_ERRORS as e:
+        logger.warning(f"Contract cache read failed ({CONTRACT_CACHE_PATH}): {e}")
+        return None
+
+    if row is None:
+        return None
+
+    con_id, payload, cached_at = row
+    if not con_id:
+        return None
+    if cached_at is None or time.time() - cached_at >= CONTRACT_CACHE_TTL:
+        logger.info(f"Cached contract {key_str} (conId={con_id}) expired; re-qualifying.")
+        return None
+    return Contract.create(**json.loads(payload))
+
+
+def _store(key_str: str, contract):
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO contracts (key, conId, json, cached_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key_str, contract.conId, _to_json(contract), time.time()),
+            )
+    except _CACHE_ERRORS as e:
+        logger.warning(f"Contract cache write failed ({CONTRACT_CACHE_PATH}): {e}")
+
+
+def qualify_cached(ib, symbol: str, sec_type: str = "STK",
+                   exchange: str = "SMART", currency: str = "USD"):
+    """
+    Qualified Contract for symbol: from memory, else the SQLite cache
+    (unless expired), else ib.qualifyContracts() (result saved to both).
+    Raises ValueError if IBKR cannot qualify it.
+    """
+    key = (symbol, sec_type, exchange, currency)
+    with _lock:
+        contract = _memory.get(key)
+    if contract is not None:
+        return contract
+
+    key_str = "|".join(key)
+    contract = _load(key_str)
+
+    if contract is None:
+        requested = Contract.create(
+            symbol=symbol, secType=sec_type, exchange=exchange, currency=currency
+        )
+        qualified = ib.qualifyContracts(requested)
+        if not qualified:
+            raise ValueError(f"Could not qualify contract for {symbol} ({sec_type} {exchange}/{currency})")
+        contract = qualified[0]
+        _store(key_str, contract)
+        logger.info(f"Qualified and cached {symbol}: conId={contract.conId}")
+
+    with _lock:
+        return _memory.setdefault(key, contract)
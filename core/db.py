@@ -23,6 +23,12 @@ DB_NAME = os.getenv("PGDATABASE", "marketdata")
 
 DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Pool sizing: parallel backtests each hold their own session, so the
+# default QueuePool(5, overflow=10) serialises sweeps.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 16))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 32))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))   # seconds
+
 # ------------------------------------------------------------------
 # Engine / Session / Base
 # ------------------------------------------------------------------
@@ -30,6 +36,12 @@ engine = create_engine(
     DATABASE_URL,
     echo=False,          # set True for SQL debug logging
     future=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,                     # drop stale connections instead of raising
+    pool_recycle=DB_POOL_RECYCLE,
+    executemany_mode="values_plus_batch",   # psycopg2 multi-row INSERT / batched UPDATE
+    connect_args={"options": "-c jit=off"}, # short OLTP queries don't benefit from JIT
 )
 
 SessionLocal = sessionmaker(
@@ -11,42 +11,83 @@ Usage:
 """
 
 import os
+import atexit
+import time
+import random
+import asyncio
+import hashlib
 import logging
 import argparse
-from ib_insync import IB, util
+from contextlib import contextmanager
+import pandas as pd
+from ib_insync import IB, Stock, util
 from threading import Lock
 from time import sleep
 from core.logger_service import get_logger   # unified logging
 
-# ---------------------------------------------------------------------
-# CLI argument parsing
-# ---------------------------------------------------------------------
-parser = argparse.ArgumentParser(description="IBKR connection service and test utility")
-parser.add_argument("-vv", "--verbose", action="store_true",
-                    help="Enable verbose IBKR internal logs")
-parser.add_argument("--test", action="store_true",
-                    help="Run a one-time connection test and print account summary")
-args, _ = parser.parse_known_args()
-
 # ---------------------------------------------------------------------
 # Logging setup (shared via logger_service)
 # ---------------------------------------------------------------------
 logger = get_logger("ibkr_service")
 
-# Optional: enable ib_insync internal logs when -vv is passed
-if args.verbose:
+
+def enable_verbose_ibkr_logging():
+    """
+    Route ib_insync's internal logs through our file + console handlers.
+    Opt-in: the -vv flag below, or call it explicitly from a script.
+    """
     ib_logger = logging.getLogger("ib_insync")
     ib_logger.setLevel(logging.INFO)
     for h in logger.handlers:        # reuse our file + console handlers
-        ib_logger.addHandler(h)
+        if h not in ib_logger.handlers:
+            ib_logger.addHandler(h)
     ib_logger.propagate = False
     logger.info("Verbose IBKR internal logging enabled (-vv)")
 
 # ---------------------------------------------------------------------
-# Global singleton state
+# Connection pool (one IB connection per host / port / clientId)
 # ---------------------------------------------------------------------
-_ib_instance = None
-_lock = Lock()
+class _Holder:
+    """Pool slot: the IB instance for one endpoint + clientId plus the lock guarding it."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.ib = None
+        self._async_lock = None
+        self._async_loop = None
+
+    def async_lock(self) -> asyncio.Lock:
+        """
+        asyncio.Lock serialising connectAsync on this slot for coroutines
+        of the running loop (asyncio locks are bound to one loop, and each
+        asyncio.run() brings a new one).
+        """
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self._async_loop is not loop:
+                self._async_lock = asyncio.Lock()
+                self._async_loop = loop
+            return self._async_lock
+
+
+_pools = {}            # (host, port, client_id) -> _Holder
+_pool_lock = Lock()    # only guards the dict itself, never a connect()
+
+
+def _pool_slot(host, port, client_id) -> _Holder:
+    with _pool_lock:
+        return _pools.setdefault((host, port, client_id), _Holder())
+
+
+def _matching_slots(client_id=None, host=None, port=None):
+    """Pool slots matching the given filters (None matches anything)."""
+    with _pool_lock:
+        return [
+            holder for (h, p, cid), holder in _pools.items()
+            if (client_id is None or cid == client_id)
+            and (host is None or h == host)
+            and (port is None or p == port)
+        ]
 
 # ---------------------------------------------------------------------
 # Default connection configuration
@@ -55,6 +96,45 @@ IB_HOST = os.getenv("IB_HOST", "172.31.112.1")
 IB_PORT = int(os.getenv("IB_PORT", 7497))
 IB_CLIENT_ID = int(os.getenv("IB_CLIENT_ID", 1))
 IB_TIMEOUT = int(os.getenv("IB_TIMEOUT", 30))
+IB_FETCH_RETRIES = int(os.getenv("IB_FETCH_RETRIES", 4))   # retries after the first request
+
+
+def _backoff(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    Exponential backoff with jitter: ~base * 2**attempt, scaled by a random
+    factor in [0.5, 1.5) so concurrent retries don't hit TWS in lockstep.
+    """
+    return min(cap, base * 2 ** attempt) * (0.5 + random.random())
+
+# ---------------------------------------------------------------------
+# Historical data cache
+# ---------------------------------------------------------------------
+# Parquet copies of recent reqHistoricalData results, so repeated fetches
+# skip the network round-trip and IBKR pacing. IBKR_CACHE_TTL (seconds)
+# overrides the bar-size based TTL; 0 disables the cache.
+HIST_CACHE_DIR = os.path.join("data", "cache", "ibkr")
+IBKR_CACHE_TTL = os.getenv("IBKR_CACHE_TTL")
+
+
+def _hist_cache_ttl(barsize: str) -> float:
+    if IBKR_CACHE_TTL is not None:
+        return float(IBKR_CACHE_TTL)
+
+    unit = barsize.split()[-1].lower()
+    if unit.startswith("sec"):
+        return 60
+    if unit.startswith("min"):
+        return 5 * 60
+    if unit.startswith("hour"):
+        return 15 * 60
+    return 60 * 60          # day / week / month bars
+
+
+def _hist_cache_path(symbol: str, duration: str, barsize: str,
+                     what_to_show: str, use_rth: bool) -> str:
+    raw = f"{symbol}|{duration}|{barsize}|{what_to_show}|{int(use_rth)}"
+    key = hashlib.sha1(raw.encode()).hexdigest()
+    return os.path.join(HIST_CACHE_DIR, f"{key}.parquet")
 
 # ---------------------------------------------------------------------
 # Connection management
@@ -64,56 +144,86 @@ def get_ib_connection(host: str = IB_HOST,
                       client_id: int = IB_CLIENT_ID,
                       timeout: int = IB_TIMEOUT) -> IB:
     """
-    Return a connected IB instance.
+    Return a connected IB instance for client_id.
     Creates one if none exists or the connection has dropped.
-    Thread-safe to allow reuse across concurrent scripts.
+    Thread-safe: callers sharing a clientId wait for a single connect(),
+    callers on other clientIds are not blocked by it.
+
+    Connections are kept per (host, port, clientId) for the life of the
+    process and reused by every caller; they are closed at exit.
     """
-    global _ib_instance
-    with _lock:
-        if _ib_instance is None:
-            _ib_instance = IB()
-        if not _ib_instance.isConnected():
+    holder = _pool_slot(host, port, client_id)
+
+    with holder.lock:
+        if holder.ib is None:
+            holder.ib = IB()
+        if not holder.ib.isConnected():
             try:
                 logger.info(f"Connecting to IBKR at {host}:{port} (clientId={client_id})...")
-                _ib_instance.connect(host, port, clientId=client_id, timeout=timeout)
+                holder.ib.connect(host, port, clientId=client_id, timeout=timeout)
                 logger.info("✅ Connected to IBKR.")
             except Exception as e:
                 logger.error(f"❌ Failed to connect to IBKR: {e}")
                 sleep(5)
                 raise
-        return _ib_instance
+        return holder.ib
+
+
+def disconnect_ib(client_id: int = None, host: str = None, port: int = None):
+    """
+    Cleanly disconnect pooled IB instances: those for client_id (and
+    host / port when given), or all of them when no filter is passed.
+    """
+    for holder in _matching_slots(client_id, host, port):
+        with holder.lock:
+            if holder.ib and holder.ib.isConnected():
+                logger.info("Disconnecting from IBKR...")
+                holder.ib.disconnect()
+                logger.info("Disconnected from IBKR.")
+            holder.ib = None
 
 
-def disconnect_ib():
-    """Cleanly disconnect the shared IB instance."""
-    global _ib_instance
-    with _lock:
-        if _ib_instance and _ib_instance.isConnected():
-            logger.info("Disconnecting from IBKR...")
-            _ib_instance.disconnect()
-            logger.info("Disconnected from IBKR.")
-        _ib_instance = None
+# Pooled connections outlive individual calls; close whatever is left when
+# the interpreter exits (registered after the logger, so it runs first)
+atexit.register(disconnect_ib)
+
+
+@contextmanager
+def ib_session(host: str = IB_HOST,
+               port: int = IB_PORT,
+               client_id: int = IB_CLIENT_ID,
+               timeout: int = IB_TIMEOUT):
+    """
+    Connection lifetime for a whole unit of work (e.g. a batch of orders):
+    yields the pooled IB instance and disconnects that client on exit.
+    Everything inside reuses the same connection.
+    """
+    ib = get_ib_connection(host, port, client_id, timeout)
+    try:
+        yield ib
+    finally:
+        disconnect_ib(client_id, host, port)
 
 
-def reconnect_ib(max_retries: int = 3, delay: int = 5):
+def reconnect_ib(max_retries: int = 3, delay: int = 5, client_id: int = IB_CLIENT_ID):
     """Attempt to reconnect if the connection drops."""
     for attempt in range(1, max_retries + 1):
         try:
-            disconnect_ib()
-            ib = get_ib_connection()
+            disconnect_ib(client_id)
+            ib = get_ib_connection(client_id=client_id)
             if ib.isConnected():
                 logger.info("Reconnection successful.")
                 return ib
         except Exception as e:
             logger.warning(f"Reconnect attempt {attempt}/{max_retries} failed: {e}")
-            sleep(delay)
+            sleep(_backoff(attempt - 1, base=delay))
     raise ConnectionError("Unable to reconnect to IBKR after multiple attempts.")
 
 
-def check_connection():
-    """Return True if currently connected."""
-    global _ib_instance
-    return bool(_ib_instance and _ib_instance.isConnected())
+def check_connection(client_id: int = None):
+    """Return True if currently connected (any pooled client when client_id is None)."""
+    holders = _matching_slots(client_id)
+    return any(h.ib is not None and h.ib.isConnected() for h in holders)
 
 
 # ---------------------------------------------------------------------
@@ -137,6 +247,112 @@ def test_connection():
 # ---------------------------------------------------------------------
 # Market Data Fetcher
 # ---------------------------------------------------------------------
+def _read_hist_cache(cache_path: str, ttl: float, symbol: str, barsize: str):
+    """Cached frame if present and younger than ttl, else None."""
+    if ttl <= 0 or not os.path.exists(cache_path):
+        return None
+
+    age = time.time() - os.path.getmtime(cache_path)
+    if age >= ttl:
+        return None
+
+    try:
+        df = pd.read_parquet(cache_path)
+        logger.info(f"Using cached {barsize} bars for {symbol} ({len(df)} rows, {age:.0f}s old).")
+        return df
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable IBKR cache {cache_path}: {e}")
+        return None
+
+
+def _write_hist_cache(df, cache_path: str, ttl: float):
+    if ttl <= 0:
+        return
+    try:
+        os.makedirs(HIST_CACHE_DIR, exist_ok=True)
+        df.to_parquet(cache_path, compression="zstd")
+    except Exception as e:
+        logger.warning(f"Could not write IBKR cache {cache_path}: {e}")
+
+
+def _bars_to_df(bars):
+    df = util.df(bars)
+    df = df.rename(columns={
+        "date": "date",
+        "open": "open",
+        "high": "high",
+        "low": "low",
+        "close": "close",
+        "volume": "volume",
+    })
+    return df[["date", "open", "high", "low", "close", "volume"]]
+
+
+class _HistoricalFetch:
+    """
+    One historical-data request: cache lookup, retry policy and result
+    handling shared by get_ibkr_historical_data and its async variant,
+    which only differ in how they connect, request and sleep.
+    """
+
+    # Pacing violations and timeouts surface as an empty result or a
+    # timeout; those are retried with backoff before giving up
+    RETRYABLE = (asyncio.TimeoutError, ConnectionError)
+
+    def __init__(self, symbol, duration, barsize, what_to_show, use_rth):
+        self.symbol = symbol
+        self.barsize = barsize
+        self.cache_path = _hist_cache_path(symbol, duration, barsize, what_to_show, use_rth)
+        self.ttl = _hist_cache_ttl(barsize)
+        self.contract = Stock(symbol, "SMART", "USD")
+        self.request = {
+            "endDateTime": "",
+            "durationStr": duration,
+            "barSizeSetting": barsize,
+            "whatToShow": what_to_show,
+            "useRTH": 1 if use_rth else 0,
+            "formatDate": 1,
+        }
+        self.bars = None
+        self.reason = None
+
+    def cached(self):
+        return _read_hist_cache(self.cache_path, self.ttl, self.symbol, self.barsize)
+
+    def attempts(self):
+        """Yields the seconds to wait before each attempt (0 for the first)."""
+        for attempt in range(IB_FETCH_RETRIES + 1):
+            if not attempt:
+                yield 0
+                continue
+            wait = _backoff(attempt - 1)
+            logger.warning(
+                f"Retrying {self.symbol} historical request in {wait:.1f}s "
+                f"({attempt}/{IB_FETCH_RETRIES}): {self.reason}"
+            )
+            yield wait
+
+    def failed(self, reason: str):
+        self.reason = reason
+
+    def accept(self, bars) -> bool:
+        """Record a reply; True when it holds bars and retrying can stop."""
+        self.bars = bars
+        if not bars:
+            self.failed("no bars returned")
+        return bool(bars)
+
+    def result(self):
+        if not self.bars:
+            raise ValueError(f"No data returned from IBKR for {self.symbol}")
+
+        df = _bars_to_df(self.bars)
+        logger.info(f"✅ Retrieved {len(df)} bars for {self.symbol}.")
+
+        _write_hist_cache(df, self.cache_path, self.ttl)
+        return df
+
+
 def get_ibkr_historical_data(symbol: str,
                              duration: str = "2 Y",
                              barsize: str = "1 day",
@@ -162,42 +378,95 @@ def get_ibkr_historical_data(symbol: str,
     -------
     pd.DataFrame with columns: date, open, high, low, close, volume
     """
-    from ib_insync import Stock, util
-    import pandas as pd
-
-    ib = get_ib_connection()
-    contract = Stock(symbol, "SMART", "USD")
+    fetch = _HistoricalFetch(symbol, duration, barsize, what_to_show, use_rth)
+    df = fetch.cached()
+    if df is not None:
+        return df
 
     logger.info(f"📈 Requesting {duration} of {barsize} data for {symbol} (RTH={use_rth})...")
 
     try:
-        bars = ib.reqHistoricalData(
-            contract,
-            endDateTime="",
-            durationStr=duration,
-            barSizeSetting=barsize,
-            whatToShow=what_to_show,
-            useRTH=1 if use_rth else 0,
-            formatDate=1,
-        )
+        for wait in fetch.attempts():
+            if wait:
+                sleep(wait)
+            try:
+                ib = get_ib_connection()
+                bars = ib.reqHistoricalData(fetch.contract, **fetch.request)
+            except fetch.RETRYABLE as e:
+                fetch.failed(repr(e))
+                continue
+            if fetch.accept(bars):
+                break
 
-        if not bars:
-            raise ValueError(f"No data returned from IBKR for {symbol}")
-
-        df = util.df(bars)
-        df = df.rename(columns={
-            "date": "date",
-            "open": "open",
-            "high": "high",
-            "low": "low",
-            "close": "close",
-            "volume": "volume",
-        })
-        df = df[["date", "open", "high", "low", "close", "volume"]]
-
-        logger.info(f"✅ Retrieved {len(df)} bars for {symbol}.")
+        return fetch.result()
+
+    except Exception as e:
+        logger.error(f"❌ Error fetching data for {symbol}: {e}", exc_info=True)
+        raise
+
+
+# ---------------------------------------------------------------------
+# Async variants (for callers already running an event loop)
+# ---------------------------------------------------------------------
+async def get_ib_connection_async(host: str = IB_HOST,
+                                  port: int = IB_PORT,
+                                  client_id: int = IB_CLIENT_ID,
+                                  timeout: int = IB_TIMEOUT) -> IB:
+    """
+    get_ib_connection for coroutines: the sync connect() cannot run inside
+    an active event loop, so this awaits connectAsync on the pooled instance.
+    """
+    holder = _pool_slot(host, port, client_id)
+
+    # Concurrent fetches share this instance: only one may connect, the
+    # others wait and see it connected (a failed connectAsync disconnects
+    # the instance, which would tear down a parallel successful connect)
+    async with holder.async_lock():
+        if holder.ib is None:
+            holder.ib = IB()
+        if not holder.ib.isConnected():
+            try:
+                logger.info(f"Connecting to IBKR at {host}:{port} (clientId={client_id})...")
+                await holder.ib.connectAsync(host, port, clientId=client_id, timeout=timeout)
+                logger.info("✅ Connected to IBKR.")
+            except Exception as e:
+                logger.error(f"❌ Failed to connect to IBKR: {e}")
+                raise
+        return holder.ib
+
+
+async def get_ibkr_historical_data_async(symbol: str,
+                                         duration: str = "2 Y",
+                                         barsize: str = "1 day",
+                                         what_to_show: str = "TRADES",
+                                         use_rth: bool = True):
+    """
+    Coroutine version of get_ibkr_historical_data (same cache, retries and
+    return frame) built on reqHistoricalDataAsync, so several requests can
+    be in flight on one connection.
+    """
+    fetch = _HistoricalFetch(symbol, duration, barsize, what_to_show, use_rth)
+    df = fetch.cached()
+    if df is not None:
         return df
 
+    logger.info(f"📈 Requesting {duration} of {barsize} data for {symbol} (RTH={use_rth})...")
+
+    try:
+        for wait in fetch.attempts():
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                ib = await get_ib_connection_async()
+                bars = await ib.reqHistoricalDataAsync(fetch.contract, **fetch.request)
+            except fetch.RETRYABLE as e:
+                fetch.failed(repr(e))
+                continue
+            if fetch.accept(bars):
+                break
+
+        return fetch.result()
+
     except Exception as e:
         logger.error(f"❌ Error fetching data for {symbol}: {e}", exc_info=True)
         raise
@@ -206,6 +475,18 @@ def get_ibkr_historical_data(symbol: str,
 # Entry point
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
+    # Parsed only when run directly, so importers' sys.argv (e.g. a -vv
+    # meant for another script) is never interpreted here
+    parser = argparse.ArgumentParser(description="IBKR connection service and test utility")
+    parser.add_argument("-vv", "--verbose", action="store_true",
+                        help="Enable verbose IBKR internal logs")
+    parser.add_argument("--test", action="store_true",
+                        help="Run a one-time connection test and print account summary")
+    args, _ = parser.parse_known_args()
+
+    if args.verbose:
+        enable_verbose_ibkr_logging()
+
     if args.test:
         test_connection()
     else:
@@ -2,28 +2,222 @@
 
 import pandas as pd
 import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from core.logger_service import get_logger
+from core._njit import njit, HAVE_NUMBA
+
+try:  # optional: GIL-free C moving-window kernels
+    import bottleneck as bn
+except ImportError:  # pragma: no cover - depends on environment
+    bn = None
 from db.models.market_prices import MarketPrice
+from db.models.symbol_indicator_state import SymbolIndicatorState
 
 logger = get_logger("indicator_service")
 
+# Bump whenever indicator logic changes: it is part of the backtest frame
+# cache key, so frames computed by older code are not reused
+INDICATOR_VERSION = 1
+
+# Stored bars re-read ahead of the new ones so rolling windows are full and
+# the EWM-based indicators (MACD, Wilder ATR) have converged
+INDICATOR_WARMUP_BARS = 250
+
+
+# Indicator columns persisted on market_prices by compute_for
+STORED_INDICATORS = [
+    "ma20", "ma50", "ath",
+    "bb_mid", "bb_upper", "bb_lower",
+    "ema_fast", "ema_slow", "macd", "macd_signal",
+    "tr", "atr", "supertrend",
+]
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Series.rolling(window).mean() on a float64 array (bottleneck when available)."""
+    if bn is not None and window <= len(values):
+        return bn.move_mean(values, window, min_count=window)
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Series.rolling(window).std() (sample, ddof=1) on a float64 array."""
+    if bn is not None and window <= len(values):
+        return bn.move_std(values, window, min_count=window, ddof=1)
+    return pd.Series(values).rolling(window).std().to_numpy()
+
+
+def _ewm_mean(values: np.ndarray, **kwargs) -> np.ndarray:
+    """Series.ewm(adjust=False, **kwargs).mean() on a float64 array."""
+    return pd.Series(values).ewm(adjust=False, **kwargs).mean().to_numpy()
 
-def clean(v):
+
+@njit(cache=True)
+def _ewm_step(weighted, old_wt, cur, alpha):
     """
-    Convert numpy types and NaNs to safe Python floats for DB writes.
+    One step of pandas' ewm(adjust=False) recursion (ignore_na=False):
+    NaN inputs hold the average but still decay its weight.
     """
-    if v is None:
-        return None
-    try:
-        if pd.isna(v):
-            return None
-    except:
-        pass
-    try:
-        return float(v)
-    except:
-        return None
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if cur == cur:
+            if weighted != cur:
+                weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+            old_wt = 1.0
+    elif cur == cur:
+        weighted = cur
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def _macd_core(close, a_fast, a_slow, a_sig):
+    """
+    EMA fast / EMA slow / MACD / signal in one pass over close.
+    Returns (ema_fast, ema_slow, macd, macd_signal).
+    """
+    n = close.shape[0]
+    ema_fast = np.empty(n)
+    ema_slow = np.empty(n)
+    macd = np.empty(n)
+    signal = np.empty(n)
+
+    ef = es = sig = np.nan
+    wf = ws = wsig = 1.0
+    for i in range(n):
+        ef, wf = _ewm_step(ef, wf, close[i], a_fast)
+        es, ws = _ewm_step(es, ws, close[i], a_slow)
+        m = ef - es
+        sig, wsig = _ewm_step(sig, wsig, m, a_sig)
+
+        ema_fast[i] = ef
+        ema_slow[i] = es
+        macd[i] = m
+        signal[i] = sig
+
+    return ema_fast, ema_slow, macd, signal
+
+
+def _macd(close, fast=12, slow=26, sig=9):
+    """
+    MACD from EMAs with pandas' ewm(span=..., adjust=False) semantics;
+    a single fused Numba pass when available, else three pandas ewm calls.
+    """
+    if HAVE_NUMBA:
+        return _macd_core(close, 2 / (fast + 1), 2 / (slow + 1), 2 / (sig + 1))
+
+    ema_fast = _ewm_mean(close, span=fast)
+    ema_slow = _ewm_mean(close, span=slow)
+    macd = ema_fast - ema_slow
+    return ema_fast, ema_slow, macd, _ewm_mean(macd, span=sig)
+
+
+@njit(cache=True)
+def _rsi_core(close, n):
+    """
+    Wilder RSI: averages seeded with the simple mean of the first n
+    gains/losses, then smoothed with alpha = 1/n. NaN deltas count as 0.
+    """
+    m = close.shape[0]
+    out = np.full(m, np.nan)
+    if m <= n:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n + 1):
+        d = close[i] - close[i-1]
+        if d > 0:
+            avg_gain += d
+        elif d < 0:
+            avg_loss -= d
+    avg_gain /= n
+    avg_loss /= n
+    out[n] = 100.0 - 100.0 / (1.0 + avg_gain / (avg_loss + 1e-12))
+
+    for i in range(n + 1, m):
+        d = close[i] - close[i-1]
+        gain = d if d > 0 else 0.0
+        loss = -d if d < 0 else 0.0
+        avg_gain = (avg_gain * (n - 1) + gain) / n
+        avg_loss = (avg_loss * (n - 1) + loss) / n
+        out[i] = 100.0 - 100.0 / (1.0 + avg_gain / (avg_loss + 1e-12))
+
+    return out
+
+
+def _rsi(close, n=14):
+    """Wilder RSI; one Numba pass when available, else the same recursion via ewm."""
+    if HAVE_NUMBA:
+        return _rsi_core(close, n)
+
+    out = np.full(close.shape[0], np.nan)
+    if close.shape[0] <= n:
+        return out
+
+    delta = np.empty_like(close)
+    delta[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    # Seed bar n with the simple mean; the NaN lead-in makes ewm start there
+    for series in (gain, loss):
+        series[n] = series[1:n + 1].mean()
+        series[:n] = np.nan
+    avg_gain = _ewm_mean(gain, alpha=1 / n)
+    avg_loss = _ewm_mean(loss, alpha=1 / n)
+
+    out[n:] = 100 - 100 / (1 + avg_gain[n:] / (avg_loss[n:] + 1e-12))
+    return out
+
+
+@njit(cache=True)
+def _supertrend_core(close, upperband, lowerband):
+    """
+    Band ratcheting + trend flip for Supertrend over raw float64 arrays.
+    Returns (final_upperband, final_lowerband, supertrend, trend).
+    """
+    n = close.shape[0]
+    final_upper = np.empty(n)
+    final_lower = np.empty(n)
+    supertrend = np.empty(n)
+    trend = np.empty(n)
+    if n == 0:
+        return final_upper, final_lower, supertrend, trend
+
+    final_upper[0] = upperband[0]
+    final_lower[0] = lowerband[0]
+    trend[0] = 1.0
+    supertrend[0] = final_lower[0]
+
+    for i in range(1, n):
+        if upperband[i] < final_upper[i-1] or close[i-1] > final_upper[i-1]:
+            final_upper[i] = upperband[i]
+        else:
+            final_upper[i] = final_upper[i-1]
+
+        if lowerband[i] > final_lower[i-1] or close[i-1] < final_lower[i-1]:
+            final_lower[i] = lowerband[i]
+        else:
+            final_lower[i] = final_lower[i-1]
+
+        if trend[i-1] == 1:
+            if close[i] <= final_upper[i]:
+                trend[i] = -1.0
+                supertrend[i] = final_upper[i]
+            else:
+                trend[i] = 1.0
+                supertrend[i] = final_lower[i]
+        else:
+            if close[i] >= final_lower[i]:
+                trend[i] = 1.0
+                supertrend[i] = final_lower[i]
+            else:
+                trend[i] = -1.0
+                supertrend[i] = final_upper[i]
+
+    return final_upper, final_lower, supertrend, trend
 
 
 class IndicatorService:
@@ -33,63 +227,182 @@ class IndicatorService:
     # =====================================================================
     # DB UPDATE MODE
     # =====================================================================
-    def compute_for(self, symbol: str, resolution: str):
+    def compute_for(self, symbol: str, resolution: str, full_recompute: bool = False,
+                    since=None):
         """
         Compute indicators for ingestion and write back to DB.
+
+        Only bars newer than the symbol's watermark (SymbolIndicatorState)
+        are written; the last INDICATOR_WARMUP_BARS stored bars are re-read
+        to seed the windows. full_recompute=True ignores the watermark.
+
+        since: earliest ts the ingestion just wrote. Upserts rewrite bars in
+        place, so when since is at or before the watermark the watermark is
+        lowered to it and every bar from since onwards is recomputed.
+
+        Backfilled history is caught the same way: since then points at
+        the earliest new bar. Without since (bars written by another path),
+        bars before the watermark without indicators still force a full
+        pass, since those change every window after them.
         """
         logger.info(f"Computing indicators for {symbol} @ {resolution}")
 
-        rows = (
-            self.session.query(MarketPrice)
+        state = (
+            self.session.query(SymbolIndicatorState)
             .filter_by(symbol=symbol, resolution=resolution)
-            .order_by(MarketPrice.ts.asc())
-            .all()
+            .one_or_none()
         )
-
-        if not rows:
-            logger.warning(f"No rows found for {symbol} @ {resolution}")
-            return 0
-
-        df = pd.DataFrame(
-            [{
-                "id": r.id,
-                "ts": r.ts,
-                "open": r.open,
-                "high": r.high,
-                "low": r.low,
-                "close": r.close,
-                "volume": r.volume,
-            } for r in rows]
+        if state is None and not full_recompute:
+            state = self._state_from_stored(symbol, resolution)
+
+        # Bars at or before the watermark rewritten by this ingestion
+        rewind = None
+        if state is not None and not full_recompute and since is not None:
+            since = pd.Timestamp(since).to_pydatetime()
+            if since <= state.last_ts:
+                rewind = since
+
+        if state is not None and not full_recompute:
+            # Bars from rewind on are recomputed anyway; only older ones
+            # without indicators need the full pass
+            horizon = (
+                MarketPrice.ts <= state.last_ts if rewind is None else MarketPrice.ts < rewind
+            )
+            backfilled = self.session.query(
+                self.session.query(MarketPrice)
+                .filter(
+                    MarketPrice.symbol == symbol,
+                    MarketPrice.resolution == resolution,
+                    horizon,
+                    MarketPrice.ath.is_(None),
+                )
+                .exists()
+            ).scalar()
+            if backfilled:
+                logger.info(
+                    f"Bars without indicators before {rewind or state.last_ts} for "
+                    f"{symbol} @ {resolution}; recomputing full history."
+                )
+                full_recompute = True
+
+        # Plain column rows straight into a DataFrame; no ORM instances
+        prices = (
+            select(
+                MarketPrice.id,
+                MarketPrice.ts,
+                MarketPrice.open,
+                MarketPrice.high,
+                MarketPrice.low,
+                MarketPrice.close,
+                MarketPrice.volume,
+            )
+            .where(
+                MarketPrice.symbol == symbol,
+                MarketPrice.resolution == resolution,
+            )
         )
 
-        full = self.compute_all_indicators(df)
-
-        updated = 0
-        for i, r in enumerate(rows):
-            r.ma20 = clean(full.loc[i, "ma20"])
-            r.ma50 = clean(full.loc[i, "ma50"])
-            r.ath = clean(full.loc[i, "ath"])
-
-            r.bb_mid = clean(full.loc[i, "bb_mid"])
-            r.bb_upper = clean(full.loc[i, "bb_upper"])
-            r.bb_lower = clean(full.loc[i, "bb_lower"])
-
-            r.ema_fast = clean(full.loc[i, "ema_fast"])
-            r.ema_slow = clean(full.loc[i, "ema_slow"])
-            r.macd = clean(full.loc[i, "macd"])
-            r.macd_signal = clean(full.loc[i, "macd_signal"])
+        if state is None or full_recompute:
+            warmup = 0
+            df = self._read_prices(prices.order_by(MarketPrice.ts.asc()))
+        else:
+            if rewind is None:
+                new_bars = MarketPrice.ts > state.last_ts
+                old_bars = MarketPrice.ts <= state.last_ts
+                ath_seed = state.last_ath
+            else:
+                logger.info(
+                    f"Bars from {rewind} rewritten for {symbol} @ {resolution}; "
+                    f"recomputing from there (watermark was {state.last_ts})."
+                )
+                new_bars = MarketPrice.ts >= rewind
+                old_bars = MarketPrice.ts < rewind
+                # state.last_ath includes the rewritten bars; take the
+                # running max stored on the last untouched bar instead
+                ath_seed = self.session.scalar(
+                    select(MarketPrice.ath)
+                    .where(
+                        MarketPrice.symbol == symbol,
+                        MarketPrice.resolution == resolution,
+                        old_bars,
+                    )
+                    .order_by(MarketPrice.ts.desc())
+                    .limit(1)
+                )
+
+            new = self._read_prices(prices.where(new_bars).order_by(MarketPrice.ts.asc()))
+            if new.empty:
+                self.session.commit()   # keeps a watermark seeded by _state_from_stored
+                logger.info(f"Indicators up to date for {symbol} @ {resolution} (last_ts={state.last_ts})")
+                return 0
+
+            tail = self._read_prices(
+                prices.where(old_bars)
+                .order_by(MarketPrice.ts.desc())
+                .limit(INDICATOR_WARMUP_BARS)
+            )
+            warmup = len(tail)
+            df = pd.concat([tail.iloc[::-1], new], ignore_index=True)
 
-            r.tr = clean(full.loc[i, "tr"])
-            r.atr = clean(full.loc[i, "atr"])
-            r.supertrend = clean(full.loc[i, "supertrend"])
-            r.rsi = clean(full.loc[i, "rsi"])
+        if df.empty:
+            logger.warning(f"No rows found for {symbol} @ {resolution}")
+            return 0
 
-            updated += 1
+        # The warmup tail only sees part of the history; carry the stored max
+        if not warmup:
+            ath_seed = None
+        full = self.compute_all_indicators(df, ath_seed=ath_seed)
+
+        # One float block for the new bars; NaN becomes NULL on write
+        values = full[STORED_INDICATORS].to_numpy(dtype=np.float64)[warmup:]
+        cells = np.where(np.isnan(values), None, values).tolist()
+        ids = full["id"].to_numpy()[warmup:].tolist()
+        payload = [
+            dict(zip(STORED_INDICATORS, row), id=row_id)
+            for row_id, row in zip(ids, cells)
+        ]
+        self.session.bulk_update_mappings(MarketPrice, payload)
+        updated = len(payload)
+
+        if state is None:
+            state = SymbolIndicatorState(symbol=symbol, resolution=resolution)
+            self.session.add(state)
+        state.last_ts = full["ts"].iloc[-1].to_pydatetime()
+        last_ath = full["ath"].iloc[-1]
+        state.last_ath = None if np.isnan(last_ath) else float(last_ath)
 
         self.session.commit()
         logger.info(f"Indicator computation complete for {symbol} @ {resolution}: {updated} rows.")
         return updated
 
+    def _state_from_stored(self, symbol: str, resolution: str):
+        """
+        Watermark for bars whose indicators were written before
+        symbol_indicator_state existed: the newest bar with a stored ATH.
+        """
+        last = (
+            self.session.query(MarketPrice.ts, MarketPrice.ath)
+            .filter(
+                MarketPrice.symbol == symbol,
+                MarketPrice.resolution == resolution,
+                MarketPrice.ath.isnot(None),
+            )
+            .order_by(MarketPrice.ts.desc())
+            .first()
+        )
+        if last is None:
+            return None
+
+        state = SymbolIndicatorState(
+            symbol=symbol, resolution=resolution, last_ts=last.ts, last_ath=last.ath
+        )
+        self.session.add(state)
+        return state
+
+    def _read_prices(self, stmt):
+        # Runs on the session's connection so it shares its transaction
+        return pd.read_sql_query(stmt, self.session.connection(), parse_dates=["ts"])
+
     # =====================================================================
     # BACKTEST MODE (in-memory only)
     # =====================================================================
@@ -99,114 +412,95 @@ class IndicatorService:
     # =====================================================================
     # SHARED ENGINE (all indicators)
     # =====================================================================
-    def compute_all_indicators(self, df: pd.DataFrame):
-        out = df.copy()
+    def compute_all_indicators(self, df: pd.DataFrame, ath_seed=None):
+        """
+        ath_seed: running max close from bars before df (incremental updates).
+
+        Indicators are built as plain arrays in `new` and joined to df in a
+        single concat, instead of copying df and inserting column by column.
+        """
+        new = {}
+
+        close = df["close"].to_numpy(dtype=np.float64)
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
 
         # ==========================
         # BASIC MAs / ATH
         # ==========================
-        out["ma20"] = out["close"].rolling(20).mean()
-        out["ma50"] = out["close"].rolling(50).mean()
-        out["ath"] = out["close"].cummax()
+        ma20 = _rolling_mean(close, 20)
+        new["ma20"] = ma20
+        new["ma50"] = _rolling_mean(close, 50)
+
+        # Running max via fmax, which ignores NaN closes. Unlike
+        # Series.cummax (NaN on NaN-close bars), a bar with a missing close
+        # carries the previous ATH forward, so every bar after the first
+        # valid close has a stored ath (the backfill probe and the ATH seed
+        # in compute_for rely on that); leading NaN closes stay NaN.
+        if ath_seed is not None:
+            new["ath"] = np.fmax.accumulate(np.concatenate(([ath_seed], close)))[1:]
+        else:
+            new["ath"] = np.fmax.accumulate(close)
 
         # ==========================
         # BOLLINGER BANDS
         # ==========================
-        mid = out["close"].rolling(20).mean()
-        std = out["close"].rolling(20).std()
-        out["bb_mid"] = mid
-        out["bb_upper"] = mid + 2 * std
-        out["bb_lower"] = mid - 2 * std
+        mid = ma20
+        std = _rolling_std(close, 20)
+        new["bb_mid"] = mid
+        new["bb_upper"] = mid + 2 * std
+        new["bb_lower"] = mid - 2 * std
 
         # ==========================
         # MACD
         # ==========================
-        out["ema_fast"] = out["close"].ewm(span=12, adjust=False).mean()
-        out["ema_slow"] = out["close"].ewm(span=26, adjust=False).mean()
-        out["macd"] = out["ema_fast"] - out["ema_slow"]
-        out["macd_signal"] = out["macd"].ewm(span=9, adjust=False).mean()
+        new["ema_fast"], new["ema_slow"], new["macd"], new["macd_signal"] = _macd(close)
 
         # ==========================
         # ATR
         # ==========================
-        tr1 = out["high"] - out["low"]
-        tr2 = (out["high"] - out["close"].shift()).abs()
-        tr3 = (out["low"] - out["close"].shift()).abs()
-        out["tr"] = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        out["atr"] = out["tr"].rolling(14).mean()
+        # True range once on raw arrays; fmax skips the NaN previous close on
+        # the first bar like DataFrame.max(axis=1) did
+        prev_close = np.empty_like(close)
+        prev_close[:1] = np.nan
+        prev_close[1:] = close[:-1]
+
+        tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+        new["tr"] = tr
+        new["atr"] = _rolling_mean(tr, 14)
 
         # ==========================
         # RSI
         # ==========================
-        delta = out["close"].diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / (loss + 1e-12)
-        out["rsi"] = 100 - (100 / (1 + rs))
+        # Wilder's smoothing, matching the Supertrend ATR below
+        new["rsi"] = _rsi(close, 14)
 
-                # ==========================
+        # ==========================
         # SUPERTREND (correct implementation)
         # ==========================
         atr_len = 10
         mult = 3
 
-        hl2 = (out["high"] + out["low"]) / 2
-
-        # True range components
-        tr1 = out["high"] - out["low"]
-        tr2 = (out["high"] - out["close"].shift(1)).abs()
-        tr3 = (out["low"] - out["close"].shift(1)).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        hl2 = (high + low) / 2
 
-        # ATR using Wilder’s smoothing (CRITICAL FIX)
-        atr = tr.ewm(alpha=1/atr_len, adjust=False).mean()
+        # ATR using Wilder’s smoothing (CRITICAL FIX), over the TR above
+        atr = _ewm_mean(tr, alpha=1/atr_len)
 
         # Bands
         upperband = hl2 + mult * atr
         lowerband = hl2 - mult * atr
 
-        final_upperband = upperband.copy()
-        final_lowerband = lowerband.copy()
-
-        for i in range(1, len(out)):
-            final_upperband.iloc[i] = (
-                upperband.iloc[i]
-                if upperband.iloc[i] < final_upperband.iloc[i-1] or out["close"].iloc[i-1] > final_upperband.iloc[i-1]
-                else final_upperband.iloc[i-1]
-            )
-            final_lowerband.iloc[i] = (
-                lowerband.iloc[i]
-                if lowerband.iloc[i] > final_lowerband.iloc[i-1] or out["close"].iloc[i-1] < final_lowerband.iloc[i-1]
-                else final_lowerband.iloc[i-1]
-            )
+        # Band ratcheting and trend flips are path-dependent; run them as one
+        # compiled pass over plain arrays instead of per-element .iloc
+        final_upperband, final_lowerband, supertrend, trend = _supertrend_core(
+            close, upperband, lowerband
+        )
 
-        # Trend calculation
-        trend = pd.Series(index=out.index)
-        supertrend = pd.Series(index=out.index)
-
-        # initialise first value
-        trend.iloc[0] = 1
-        supertrend.iloc[0] = final_lowerband.iloc[0]
-
-        for i in range(1, len(out)):
-            if trend.iloc[i-1] == 1:
-                if out["close"].iloc[i] <= final_upperband.iloc[i]:
-                    trend.iloc[i] = -1
-                    supertrend.iloc[i] = final_upperband.iloc[i]
-                else:
-                    trend.iloc[i] = 1
-                    supertrend.iloc[i] = final_lowerband.iloc[i]
-            else:
-                if out["close"].iloc[i] >= final_lowerband.iloc[i]:
-                    trend.iloc[i] = 1
-                    supertrend.iloc[i] = final_lowerband.iloc[i]
-                else:
-                    trend.iloc[i] = -1
-                    supertrend.iloc[i] = final_upperband.iloc[i]
-
-        out["supertrend"] = supertrend
-        out["supertrend_upper"] = final_upperband
-        out["supertrend_lower"] = final_lowerband
-        out["supertrend_trend"] = trend
+        new["supertrend"] = supertrend
+        new["supertrend_upper"] = final_upperband
+        new["supertrend_lower"] = final_lowerband
+        new["supertrend_trend"] = trend
 
-        return out
+        # Recomputing over a frame that already carries indicators replaces them
+        base = df.drop(columns=[c for c in new if c in df.columns])
+        return pd.concat([base, pd.DataFrame(new, index=df.index)], axis=1)
@@ -1,7 +1,17 @@
 # core/ingest_engine.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 import pandas as pd
 from core.logger_service import get_logger
-from core.ibkr_service import get_ibkr_historical_data, disconnect_ib
+from core.ibkr_service import (
+    get_ibkr_historical_data,
+    get_ibkr_historical_data_async,
+    disconnect_ib,
+    IB_HOST,
+    IB_PORT,
+    IB_CLIENT_ID,
+)
 from ingest.prices.price_ingest import PriceIngestor
 from core.indicator_service import IndicatorService
 from db.models.instruments import Instrument
@@ -9,6 +19,27 @@ from core.db import SessionLocal
 
 logger = get_logger("ingest_engine")
 
+# CLI resolution → IBKR barSize
+RESOLUTION_MAP = MappingProxyType({
+    "1d": "1 day",
+    "1day": "1 day",
+    "1D": "1 day",
+
+    "1h": "1 hour",
+    "1H": "1 hour",
+
+    "2h": "2 hours",
+    "3h": "3 hours",
+    "4h": "4 hours",
+    "8h": "8 hours",
+
+    "1w": "1W",
+    "1W": "1W",
+
+    "1m": "1M",
+    "1M": "1M",
+})
+
 
 class IngestionEngine:
     """
@@ -26,36 +57,7 @@ class IngestionEngine:
         """
         Fetches data from IBKR using the correct barSize mapping.
         """
-        from core.ibkr_service import get_ibkr_historical_data
-
-        # Map CLI resolution → IBKR barSize
-        resolution_map = {
-            "1d": "1 day",
-            "1day": "1 day",
-            "1D": "1 day",
-
-            "1h": "1 hour",
-            "1H": "1 hour",
-
-            "2h": "2 hours",
-            "3h": "3 hours",
-            "4h": "4 hours",
-            "8h": "8 hours",
-
-            "1w": "1W",
-            "1W": "1W",
-
-            "1m": "1M",
-            "1M": "1M",
-        }
-
-        if resolution not in resolution_map:
-            raise ValueError(
-                f"Unsupported resolution '{resolution}'. "
-                f"Must be one of: {list(resolution_map.keys())}"
-            )
-
-        bar_size = resolution_map[resolution]
+        bar_size = self._bar_size(resolution)
 
         logger.info(f"Fetching data from IBKR: symbol={symbol}, duration={duration}, barSize={bar_size}")
 
@@ -68,6 +70,32 @@ class IngestionEngine:
         )
         return df
 
+    async def fetch_async(self, symbol: str, duration: str, resolution: str):
+        """
+        fetch() as a coroutine, so several symbols can be requested on one
+        IB connection while earlier ones are being stored.
+        """
+        bar_size = self._bar_size(resolution)
+
+        logger.info(f"Fetching data from IBKR: symbol={symbol}, duration={duration}, barSize={bar_size}")
+
+        return await get_ibkr_historical_data_async(
+            symbol=symbol,
+            duration=duration,
+            barsize=bar_size,
+            what_to_show="TRADES",
+            use_rth=True,
+        )
+
+    @staticmethod
+    def _bar_size(resolution: str) -> str:
+        if resolution not in RESOLUTION_MAP:
+            raise ValueError(
+                f"Unsupported resolution '{resolution}'. "
+                f"Must be one of: {list(RESOLUTION_MAP.keys())}"
+            )
+        return RESOLUTION_MAP[resolution]
+
     # ------------------------------------------------------------------
     def ensure_instrument(self, symbol: str):
         inst = self.session.query(Instrument).filter_by(symbol=symbol).first()
@@ -83,60 +111,17 @@ class IngestionEngine:
             self.session.add(inst)
             self.session.commit()
 
-    # ------------------------------------------------------------------
-    # inside IngestionEngine class
-
-    async def ingest_async(self, tasks):
-        """
-        Run multiple fetches concurrently:
-        tasks = [
-        (contract, duration, barSize, symbol, resolution),
-        ...
-        ]
-        """
-
-        from core.async_ibkr_fetcher import AsyncIBKRFetcher
-
-        fetcher = AsyncIBKRFetcher(
-            host=self.host, port=self.port, client_id=self.client_id
-        )
-
-        await fetcher.connect()
-
-        coroutines = [
-            fetcher.fetch(contract, duration, bar_size)
-            for (contract, duration, bar_size, symbol, resolution) in tasks
-        ]
-
-        results = await asyncio.gather(*coroutines)
-
-        # Process results sequentially → write to DB
-        output = {}
-        for idx, bars in enumerate(results):
-            contract, duration, bar_size, symbol, resolution = tasks[idx]
-            output_key = f"{symbol}-{resolution}"
-
-            # Store in DB (serialised)
-            df = self._convert_bars_to_df(bars, symbol, resolution)
-            inserted = self._save_df(df)
-
-            # Compute indicators
-            self.indicators.compute_for(symbol, resolution)
-
-            output[output_key] = {
-                "fetched": len(bars),
-                "inserted": inserted,
-                "indicator_rows": len(df),
-            }
-
-        await fetcher.disconnect()
-        return output
-
     def ingest_dataframe(self, symbol: str, resolution: str, df: pd.DataFrame) -> int:
         """
         Insert OHLCV rows.
+
+        Uses PostgreSQL COPY when available; other dialects go through the
+        row-by-row ORM upsert.
         """
-        inserted = self.ingestor.ingest_dataframe(symbol, df, resolution)
+        if self.session.get_bind().dialect.name == "postgresql":
+            inserted = self.ingestor.copy_dataframe(symbol, df, resolution)
+        else:
+            inserted = self.ingestor.ingest_dataframe(symbol, df, resolution)
         logger.info(
             f"Ingestion into DB complete for {symbol} / {resolution}: {inserted} new rows."
         )
@@ -146,8 +131,8 @@ class IngestionEngine:
     def run(self, symbol: str, resolution: str, duration: str):
         """
         Full ingestion pipeline:
-          1. ensure instrument exists
-          2. fetch from IBKR
+          1. fetch from IBKR
+          2. ensure instrument exists
           3. ingest rows
           4. recompute indicators
         """
@@ -155,19 +140,13 @@ class IngestionEngine:
             f"Running ingest pipeline: {symbol} / {resolution} / duration={duration}"
         )
 
-        self.ensure_instrument(symbol)
-
         df = self.fetch(symbol, duration, resolution)
         if df is None or df.empty:
             raise ValueError(f"No data returned from IBKR for {symbol}")
 
         logger.info(f"Fetched {len(df)} rows from IBKR for {symbol}.")
 
-        inserted = self.ingest_dataframe(symbol, resolution, df)
-
-        updated = self.indicators.compute_for(symbol, resolution)
-
-        disconnect_ib()
+        inserted, updated = self._store(symbol, resolution, df)
 
         logger.info(
             f"Auto-ingest result for {symbol} @ {resolution}: fetched={len(df)} inserted={inserted} indicator_rows={updated}"
@@ -178,6 +157,74 @@ class IngestionEngine:
             "indicator_rows": updated,
         }
 
+    # ------------------------------------------------------------------
+    def run_many(self, symbols, resolution: str, duration: str, max_concurrent_fetches: int = 2):
+        """
+        Ingest several symbols with fetching and storing overlapped: while
+        one symbol's rows are inserted and its indicators recomputed (in a
+        worker thread), the next symbols are already being fetched.
+
+        At most max_concurrent_fetches historical requests are in flight to
+        respect IBKR pacing. The ingest client's IB connection (the default
+        host / port / clientId used by the fetches) is disconnected once at
+        the end; other pooled clients, e.g. a TradeService, are left alone.
+
+        Returns {symbol: result dict as from run(), or {"error": msg}}.
+        """
+        return asyncio.run(
+            self._run_many(symbols, resolution, duration, max_concurrent_fetches)
+        )
+
+    async def _run_many(self, symbols, resolution, duration, max_concurrent_fetches):
+        try:
+            return await self._pipeline(symbols, resolution, duration, max_concurrent_fetches)
+        finally:
+            # While the loop the connection was opened on is still running;
+            # only the slot the async fetches use
+            disconnect_ib(IB_CLIENT_ID, IB_HOST, IB_PORT)
+
+    async def _pipeline(self, symbols, resolution, duration, max_concurrent_fetches):
+        loop = asyncio.get_running_loop()
+        fetch_slots = asyncio.Semaphore(max_concurrent_fetches)
+
+        # One worker: every DB write goes through self.session, which must
+        # not be used from two threads at once
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest") as db_worker:
+
+            async def one(symbol):
+                async with fetch_slots:
+                    df = await self.fetch_async(symbol, duration, resolution)
+                if df is None or df.empty:
+                    raise ValueError(f"No data returned from IBKR for {symbol}")
+
+                inserted, updated = await loop.run_in_executor(
+                    db_worker, self._store, symbol, resolution, df
+                )
+                return {"fetched": len(df), "inserted": inserted, "indicator_rows": updated}
+
+            results = await asyncio.gather(*(one(s) for s in symbols), return_exceptions=True)
+
+        output = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"Ingest failed for {symbol} @ {resolution}: {result}")
+                result = {"error": str(result)}
+            output[symbol] = result
+
+        logger.info(
+            f"Batch ingest complete @ {resolution}: "
+            f"{sum('error' not in r for r in output.values())}/{len(output)} symbols ok"
+        )
+        return output
+
+    def _store(self, symbol: str, resolution: str, df: pd.DataFrame):
+        """Insert fetched rows and bring indicators up to date; returns (inserted, updated)."""
+        self.ensure_instrument(symbol)
+        inserted = self.ingest_dataframe(symbol, resolution, df)
+        since = self.ingestor.touched_from.get((symbol, resolution))
+        updated = self.indicators.compute_for(symbol, resolution, since=since)
+        return inserted, updated
+
     # ------------------------------------------------------------------
     def close(self):
         self.session.close()
@@ -1,10 +1,90 @@
 # core/logger_service.py
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
+
+_formatter = logging.Formatter(
+    fmt="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+# Loggers only enqueue records; one background listener thread does the
+# file / console writes (and rotation) for every logger.
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+# name -> configured logger; get_logger runs at import time in most modules
+_loggers = {}
+
+
+class _LogRouter(logging.Handler):
+    """
+    Listener-side handler: writes each record to its logger's rotating
+    file plus the shared console stream. Only the listener thread calls it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.files = {}
+        self.stream = logging.StreamHandler()
+        self.stream.setFormatter(_formatter)
+
+    def emit(self, record):
+        name = getattr(record, "log_file", record.name)
+        handler = self.files.get(name)
+        if handler is None:
+            log_path = os.path.join(LOG_DIR, f"{name}.log")
+            handler = RotatingFileHandler(log_path, maxBytes=2_000_000, backupCount=5)
+            handler.setFormatter(_formatter)
+            self.files[name] = handler
+
+        handler.handle(record)
+        self.stream.handle(record)
+
+    def close(self):
+        for handler in self.files.values():
+            handler.close()
+        self.stream.flush()
+        super().close()
+
+
+class _FileQueueHandler(QueueHandler):
+    """
+    Tags records with the log file of the logger that owns this handler, so
+    loggers sharing it (e.g. ib_insync under -vv) land in the same file.
+    """
+
+    def __init__(self, q, log_file: str):
+        super().__init__(q)
+        self.log_file = log_file
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.log_file = self.log_file
+        return record
+
+
+def _ensure_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            router = _LogRouter()
+            _listener = QueueListener(_log_queue, router)
+            _listener.start()
+
+            # Drain whatever is still queued before the interpreter exits
+            def _shutdown():
+                _listener.stop()
+                router.close()
+
+            atexit.register(_shutdown)
 
 
 def get_logger(name: str):
@@ -12,24 +92,18 @@ def get_logger(name: str):
     Returns a logger with rotating file handler.
     Each module should request a logger using its module name.
     """
-    logger = logging.getLogger(name)
-    if logger.handlers:
-        return logger
+    cached = _loggers.get(name)
+    if cached is not None:
+        return cached
 
-    logger.setLevel(logging.INFO)
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.setLevel(logging.INFO)
 
-    log_path = os.path.join(LOG_DIR, f"{name}.log")
-    handler = RotatingFileHandler(log_path, maxBytes=2_000_000, backupCount=5)
-    formatter = logging.Formatter(
-        fmt="%(asctime)s [%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+        _ensure_listener()
+        logger.addHandler(_FileQueueHandler(_log_queue, name))
 
-    stream = logging.StreamHandler()
-    stream.setFormatter(formatter)
-    logger.addHandler(stream)
+        logger.propagate = False
 
-    logger.propagate = False
+    _loggers[name] = logger
     return logger
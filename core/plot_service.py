@@ -1,52 +1,176 @@
 # core/plot_service.py
 
+# matplotlib is imported inside the methods that draw: it costs a few
+# hundred ms on a cold start and most callers never plot.
 import os
-import matplotlib.pyplot as plt
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from core.logger_service import get_logger
 
 logger = get_logger("plot_service")
 
+# zlib level 1 is several times faster than the default 6 for a few
+# percent larger files; Software=None drops the tEXt chunk. No
+# bbox_inches="tight": the figures use the tight layout engine instead,
+# which avoids savefig's extra bbox-measuring render.
+PNG_SAVE_KWARGS = {
+    "dpi": 140,
+    "metadata": {"Software": None},
+    "pil_kwargs": {"compress_level": 1, "optimize": False},
+}
+
+# Above this many extra equity curves they are drawn as one LineCollection
+LINE_COLLECTION_MIN_CURVES = 5
+
+
+def _equity_curves(df):
+    """Buy & hold and strategy equity, cumprod on the raw return arrays."""
+    bh_eq = np.cumprod(1.0 + df["return"].to_numpy(dtype=np.float64))
+    strat_eq = np.cumprod(1.0 + df["strategy_return"].to_numpy(dtype=np.float64))
+    return bh_eq, strat_eq
+
+
+# Plot worker processes: Agg rendering and PNG compression are CPU-bound,
+# so separate figures render in parallel in separate processes
+PLOT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Per worker process: one PlotService, so its cached figures are reused
+_worker_service = None
+
+
+def _plot_in_worker(args, kwargs):
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = PlotService()
+    return _worker_service.plot(*args, **kwargs)
+
 
 class PlotService:
 
+    # Shared by all instances in this process; created on first plot_async
+    _executor = None
+    _executor_lock = threading.Lock()
+
     def __init__(self):
         self.plot_dir = "data/plots"
         os.makedirs(self.plot_dir, exist_ok=True)
 
+        # mode -> (fig, ax_price, ax_equity), reused across plot() calls
+        self._figures = {}
+
     # ------------------------------------------------------------------
-    def plot(self, symbol, resolution, df, strategy_return, buyhold_return, mode="full"):
+    def plot(self, symbol, resolution, df, strategy_return, buyhold_return, mode="full",
+             equity_curves=None):
         """
         mode = "simple" or "full"
+        equity_curves = optional {label: equity array aligned with df},
+                        overlaid on the equity axis of the full plot
+                        (e.g. strategy variants)
+
+        Returns the path of the written PNG.
         """
         if mode == "simple":
             return self._plot_simple(symbol, resolution, df, strategy_return, buyhold_return)
         else:
-            return self._plot_full(symbol, resolution, df, strategy_return, buyhold_return)
+            return self._plot_full(
+                symbol, resolution, df, strategy_return, buyhold_return, equity_curves
+            )
+
+    def plot_async(self, symbol, resolution, df, strategy_return, buyhold_return, mode="full",
+                   equity_curves=None):
+        """
+        plot() in a worker process. Returns a Future resolving to the PNG
+        path; drivers submit one per symbol/strategy and collect them.
+        """
+        args = (symbol, resolution, df, strategy_return, buyhold_return)
+        kwargs = {"mode": mode, "equity_curves": equity_curves}
+        return self._pool().submit(_plot_in_worker, args, kwargs)
+
+    @classmethod
+    def _pool(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                # spawn: a forked child would inherit the parent's matplotlib
+                # and logging threads / locks in whatever state they were in
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=PLOT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return cls._executor
+
+    @classmethod
+    def shutdown_pool(cls, wait=True):
+        """Wait for queued plot_async jobs and stop the worker processes."""
+        with cls._executor_lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------
+    def _figure(self, mode, figsize):
+        """
+        Cached Agg figure for a plot mode, cleared for the next plot.
+        Built with Figure + FigureCanvasAgg directly, so no pyplot state
+        (figure manager, GUI backend) is involved.
+        """
+        cached = self._figures.get(mode)
+        if cached is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+            fig = Figure(figsize=figsize, layout="tight")
+            FigureCanvasAgg(fig)
+            ax_price = fig.add_subplot(111)
+            ax_equity = ax_price.twinx()
+            cached = self._figures[mode] = (fig, ax_price, ax_equity)
+        else:
+            _, ax_price, ax_equity = cached
+            ax_price.clear()
+            ax_equity.clear()
+
+            # clear() resets what twinx() set up on the secondary axis
+            ax_price.yaxis.tick_left()
+            ax_equity.yaxis.tick_right()
+            ax_equity.yaxis.set_label_position("right")
+            ax_equity.yaxis.set_offset_position("right")
+            ax_equity.xaxis.set_visible(False)
+            ax_equity.patch.set_visible(False)
+        return cached
 
     # ------------------------------------------------------------------
     def _plot_simple(self, symbol, resolution, df, strategy_return, buyhold_return):
 
-        fig, ax_price = plt.subplots(figsize=(13, 6))
+        fig, ax_price, ax_equity = self._figure("simple", (13, 6))
+
+        import matplotlib.dates as mdates
+
+        # Dates → matplotlib float days once, shared by every artist
+        x = mdates.date2num(df["date"].to_numpy())
 
         # --- Price curve ---
-        ax_price.plot(df["date"], df["close"], color="black", label="Price")
+        ax_price.plot(x, df["close"], color="black", label="Price", rasterized=True)
+        ax_price.xaxis_date()
         ax_price.set_ylabel("Price")
 
         # --- Equity curves on secondary axis ---
-        ax_equity = ax_price.twinx()
+        bh_eq, strat_eq = _equity_curves(df)
         ax_equity.plot(
-            df["date"],
-            (1 + df["return"]).cumprod(),
+            x,
+            bh_eq,
             alpha=0.5,
-            label="Buy & Hold equity"
+            label="Buy & Hold equity",
+            rasterized=True,
         )
         ax_equity.plot(
-            df["date"],
-            (1 + df["strategy_return"]).cumprod(),
+            x,
+            strat_eq,
             alpha=0.8,
-            label="Strategy equity"
+            label="Strategy equity",
+            rasterized=True,
         )
         ax_equity.set_ylabel("Equity")
 
@@ -61,55 +185,70 @@ class PlotService:
         fname = f"{symbol}_{resolution}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_simple.png"
         full_path = os.path.join(self.plot_dir, fname)
 
-        fig.savefig(full_path, dpi=140, bbox_inches="tight")
-        plt.close(fig)
+        fig.savefig(full_path, **PNG_SAVE_KWARGS)
 
         logger.info(f"Saved simple plot → {full_path}")
+        return full_path
 
     # ------------------------------------------------------------------
-    def _plot_full(self, symbol, resolution, df, strategy_return, buyhold_return):
+    def _plot_full(self, symbol, resolution, df, strategy_return, buyhold_return,
+                   equity_curves=None):
+
+        fig, ax_price, ax_equity = self._figure("full", (15, 8))
+
+        import matplotlib.dates as mdates
 
-        fig, ax_price = plt.subplots(figsize=(15, 8))
+        # Dates → matplotlib float days once, shared by every artist
+        x = mdates.date2num(df["date"].to_numpy())
 
         # ----------------------------------------------------
         # Primary axis — PRICE + Buy/Sell markers
+        # (data artists are rasterized; axes, legend and table stay vector)
         # ----------------------------------------------------
-        ax_price.plot(df["date"], df["close"], label="Price", color="black")
+        ax_price.plot(x, df["close"], label="Price", color="black", rasterized=True)
+        ax_price.xaxis_date()
         ax_price.set_ylabel("Price")
 
-        # Buy/Sell markers
-        buy_mask = df["position"].diff() == 1
-        sell_mask = df["position"].diff() == -1
+        # Buy/Sell markers: positions where the position steps up / down
+        position = df["position"].to_numpy()
+        close = df["close"].to_numpy()
+        delta = np.diff(position, prepend=position[:1])
+        buy_idx = np.flatnonzero(delta == 1)
+        sell_idx = np.flatnonzero(delta == -1)
 
-        ax_price.scatter(df.loc[buy_mask, "date"],
-                         df.loc[buy_mask, "close"],
-                         color="green", marker="^", s=80, label="BUY")
+        ax_price.scatter(x[buy_idx],
+                         close[buy_idx],
+                         color="green", marker="^", s=80, label="BUY", rasterized=True)
 
-        ax_price.scatter(df.loc[sell_mask, "date"],
-                         df.loc[sell_mask, "close"],
-                         color="red", marker="v", s=80, label="SELL")
+        ax_price.scatter(x[sell_idx],
+                         close[sell_idx],
+                         color="red", marker="v", s=80, label="SELL", rasterized=True)
 
         # ----------------------------------------------------
         # Secondary axis — EQUITY CURVES
         # ----------------------------------------------------
-        ax_equity = ax_price.twinx()
-
+        bh_eq, strat_eq = _equity_curves(df)
         ax_equity.plot(
-            df["date"],
-            (1 + df["return"]).cumprod(),
+            x,
+            bh_eq,
             label="Buy & Hold",
             alpha=0.6,
-            linestyle="-"
+            linestyle="-",
+            rasterized=True,
         )
 
         ax_equity.plot(
-            df["date"],
-            (1 + df["strategy_return"]).cumprod(),
+            x,
+            strat_eq,
             label="Strategy",
             alpha=0.9,
-            linestyle="-"
+            linestyle="-",
+            rasterized=True,
         )
 
+        if equity_curves:
+            self._plot_extra_equity(ax_equity, x, equity_curves)
+
         ax_equity.set_ylabel("Equity")
 
         # ----------------------------------------------------
@@ -126,22 +265,23 @@ class PlotService:
         ax_price.set_xlabel("Date")
 
         # ----------------------------------------------------
-        # Performance table (kept the same)
+        # Performance box: one text artist (on the equity axis, which is
+        # drawn above the price axis)
         # ----------------------------------------------------
-        table_data = [
-            ["Strategy return", f"{strategy_return*100:.2f}%"],
-            ["Buy & Hold return", f"{buyhold_return*100:.2f}%"],
-            ["Δ Return", f"{(strategy_return-buyhold_return)*100:.2f}%"],
+        rows = [
+            ("Strategy return", strategy_return),
+            ("Buy & Hold return", buyhold_return),
+            ("Δ Return", strategy_return - buyhold_return),
         ]
-
-        table = plt.table(
-            cellText=table_data,
-            colLabels=None,
-            colWidths=[0.25, 0.15],
-            cellLoc="left",
-            loc="lower right",
+        stats_str = "\n".join(f"{label:<18}{value*100:>8.2f}%" for label, value in rows)
+
+        ax_equity.text(
+            0.98, 0.02, stats_str,
+            transform=ax_equity.transAxes,
+            ha="right", va="bottom",
+            family="monospace",
+            bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray"),
         )
-        table.scale(1, 1.2)
 
         # ----------------------------------------------------
         # Save
@@ -149,7 +289,36 @@ class PlotService:
         fname = f"{symbol}_{resolution}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_full.png"
         full_path = os.path.join(self.plot_dir, fname)
 
-        fig.savefig(full_path, dpi=140, bbox_inches="tight")
-        plt.close(fig)
+        fig.savefig(full_path, **PNG_SAVE_KWARGS)
 
         logger.info(f"Saved full plot → {full_path}")
+        return full_path
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _plot_extra_equity(ax_equity, x, equity_curves):
+        """
+        Overlay additional equity curves. A few are plotted as individual
+        lines; many are batched into a single LineCollection (one transform
+        and draw call instead of one per Line2D).
+        """
+        if len(equity_curves) <= LINE_COLLECTION_MIN_CURVES:
+            for label, curve in equity_curves.items():
+                ax_equity.plot(x, curve, label=label, alpha=0.7, linewidth=1.0, rasterized=True)
+            return
+
+        from matplotlib.collections import LineCollection
+
+        curves = np.asarray(list(equity_curves.values()), dtype=np.float64)
+        segments = np.stack([np.broadcast_to(x, curves.shape), curves], axis=-1)
+
+        lc = LineCollection(
+            segments,
+            linewidths=1.0,
+            colors="tab:gray",
+            alpha=0.7,
+            label=f"Variants ({len(curves)})",
+            rasterized=True,
+        )
+        ax_equity.add_collection(lc)
+        ax_equity.autoscale_view()
@@ -1,10 +1,15 @@
 # core/trade_service.py
 """
 Trade placement service for IBKR.
+
+Nothing here disconnects per order: orders reuse the pooled connection,
+and callers own its lifetime, typically with ibkr_service.ib_session().
 """
 
+import asyncio
 from ib_insync import MarketOrder, LimitOrder
 from core.ibkr_service import get_ib_connection, disconnect_ib
+from core.contract_cache import qualify_cached
 from core.logger_service import get_logger
 
 logger = get_logger("trade_service")
@@ -16,21 +21,85 @@ class TradeService:
         self.port = port
         self.client_id = client_id
 
+    def connection(self):
+        return get_ib_connection(self.host, self.port, self.client_id)
+
     def place_market_order(self, symbol: str, quantity: int, action="BUY"):
-        ib = get_ib_connection(self.host, self.port, self.client_id)
-        contract = ib.qualifyContracts(Stock(symbol, "SMART", "USD"))[0]
+        ib = self.connection()
+        contract = qualify_cached(ib, symbol)
         order = MarketOrder(action, quantity)
         trade = ib.placeOrder(contract, order)
         logger.info(f"Market order placed: {symbol} {quantity} {action}")
         return trade
 
     def place_limit_order(self, symbol: str, quantity: int, price: float, action="BUY"):
-        ib = get_ib_connection(self.host, self.port, self.client_id)
-        contract = ib.qualifyContracts(Stock(symbol, "SMART", "USD"))[0]
+        ib = self.connection()
+        contract = qualify_cached(ib, symbol)
         order = LimitOrder(action, quantity, price)
         trade = ib.placeOrder(contract, order)
         logger.info(f"Limit order placed: {symbol} {quantity} @ {price} {action}")
         return trade
 
+    def cancel_order(self, order_id: int):
+        ib = self.connection()
+        for trade in ib.openTrades():
+            if trade.order.orderId == order_id:
+                ib.cancelOrder(trade.order)
+                logger.info(f"Cancel requested for order {order_id} ({trade.contract.symbol})")
+                return trade
+        raise ValueError(f"No open order with id {order_id}")
+
     def close(self):
-        disconnect_ib()
+        # Only this service's pool slot; other clients (e.g. ingestion)
+        # in the same process keep their connections
+        disconnect_ib(self.client_id, self.host, self.port)
+
+
+# ------------------------------------------------------------------
+def wait_until_done(ib, trade, wait_timeout: float = 30.0):
+    """
+    Block until the trade reaches a final state (filled / cancelled) or
+    wait_timeout seconds pass. Wakes on the order status event itself
+    rather than polling the connection.
+    """
+    if not trade.isDone():
+        done = asyncio.Event()
+
+        def on_status(t):
+            if t.isDone():
+                done.set()
+
+        trade.statusEvent += on_status
+        try:
+            ib.run(asyncio.wait_for(done.wait(), wait_timeout))
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Order {trade.order.orderId} not done after {wait_timeout}s "
+                f"(status: {trade.orderStatus.status})"
+            )
+        finally:
+            trade.statusEvent -= on_status
+
+    # Let any callbacks still queued for this trade run
+    ib.sleep(0)
+    return trade
+
+
+def place_market_order(symbol: str, action: str, quantity: int = 1, wait_timeout: float = 30.0):
+    """
+    Place a market order and wait for it to complete (see wait_until_done).
+    Returns the ib_insync Trade.
+    """
+    service = TradeService()
+    trade = service.place_market_order(symbol, quantity, action)
+    return wait_until_done(service.connection(), trade, wait_timeout)
+
+
+def cancel_order(order_id: int, wait_timeout: float = 30.0):
+    """
+    Cancel an open order by orderId and wait for IBKR to confirm.
+    Returns the ib_insync Trade.
+    """
+    service = TradeService()
+    trade = service.cancel_order(order_id)
+    return wait_until_done(service.connection(), trade, wait_timeout)
@@ -1,13 +1,86 @@
+from sqlalchemy import text
 from core.db import engine, Base
 from db.models.instruments import Instrument
 from db.models.market_prices import MarketPrice
 from db.models.market_events import MarketEvent
 from db.models.symbol_events import SymbolEvent
 from db.models.external_signals import ExternalSignal
+from db.models.symbol_indicator_state import SymbolIndicatorState
+
+# Indexes from earlier schema versions; create_all never drops anything,
+# so existing databases shed them here.
+LEGACY_INDEXES = [
+    "ix_market_prices_symbol",   # covered by idx_symbol_ts_res / idx_symbol_res_ts
+    "ix_market_prices_ts",       # never used without symbol
+]
+
+
+def drop_legacy_indexes():
+    with engine.begin() as conn:
+        for name in LEGACY_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def narrow_price_columns():
+    """
+    PostgreSQL: convert market_prices columns the model now declares as
+    REAL but an older schema created as double precision. All of them go
+    in one ALTER TABLE, so the table is rewritten once.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    real_columns = {
+        col.name for col in MarketPrice.__table__.columns
+        if getattr(col.type, "precision", None) == 24
+    }
+
+    with engine.begin() as conn:
+        doubles = conn.execute(text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = 'market_prices' AND data_type = 'double precision'"
+        )).scalars().all()
+
+        todo = sorted(real_columns.intersection(doubles))
+        if todo:
+            print(f"Converting market_prices columns to REAL: {', '.join(todo)}")
+            clauses = ", ".join(f"ALTER COLUMN {name} TYPE REAL" for name in todo)
+            conn.execute(text(f"ALTER TABLE market_prices {clauses}"))
+
+
+def convert_json_columns():
+    """
+    PostgreSQL: json columns from older schemas become jsonb (the models
+    now declare JsonDoc). One ALTER TABLE per affected table.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        legacy = conn.execute(text(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND data_type = 'json'"
+        )).all()
+
+        by_table = {}
+        for table, column in legacy:
+            if table in Base.metadata.tables:
+                by_table.setdefault(table, []).append(column)
+
+        for table, columns in by_table.items():
+            print(f"Converting {table} columns to JSONB: {', '.join(columns)}")
+            clauses = ", ".join(
+                f"ALTER COLUMN {name} TYPE jsonb USING {name}::jsonb" for name in columns
+            )
+            conn.execute(text(f"ALTER TABLE {table} {clauses}"))
+
 
 def init_db():
     print("Creating tables...")
     Base.metadata.create_all(bind=engine)
+    drop_legacy_indexes()
+    narrow_price_columns()
+    convert_json_columns()
     print("Done.")
 
 if __name__ == "__main__":
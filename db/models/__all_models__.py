@@ -8,3 +8,4 @@ from db.models.market_prices import MarketPrice
 from db.models.market_events import MarketEvent
 from db.models.symbol_events import SymbolEvent
 from db.models.external_signals import ExternalSignal
+from db.models.symbol_indicator_state import SymbolIndicatorState
@@ -0,0 +1,10 @@
+# db/models/_types.py
+"""
+Column types shared by several models.
+"""
+
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSONB on PostgreSQL (stored parsed, GIN-indexable); plain JSON elsewhere
+JsonDoc = JSON().with_variant(JSONB(), "postgresql")
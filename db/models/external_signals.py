@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, JSON
+from sqlalchemy import Column, Integer, Float, String, DateTime
 from core.db import Base
+from db.models._types import JsonDoc
 
 class ExternalSignal(Base):
     __tablename__ = "external_signals"
@@ -10,4 +11,4 @@ class ExternalSignal(Base):
     event_type = Column(String(50))   # WAR_RISK, CYBER_ATTACK, CLIMATE, etc.
     severity = Column(Float)          # optional normalized scale
     description = Column(String(255))
-    details = Column(JSON)
+    details = Column(JsonDoc)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, JSON
+from sqlalchemy import Column, String, Integer, Float
 from core.db import Base
+from db.models._types import JsonDoc
 
 class Instrument(Base):
     __tablename__ = "instruments"
@@ -11,7 +12,7 @@ class Instrument(Base):
     exchange = Column(String(50))
     currency = Column(String(10))
     tick_size = Column(Float)
-    contract_spec = Column(JSON)          # expiry, multiplier, etc.
+    contract_spec = Column(JsonDoc)          # expiry, multiplier, etc.
 
     def __repr__(self):
         return f"<Instrument {self.symbol}>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, JSON
+from sqlalchemy import Column, Integer, Float, String, DateTime
 from core.db import Base
+from db.models._types import JsonDoc
 
 class MarketEvent(Base):
     __tablename__ = "market_events"
@@ -9,4 +10,4 @@ class MarketEvent(Base):
     event_type = Column(String(50), nullable=False)    # CPI, BOE_RATE, GDP, etc.
     value = Column(Float)
     description = Column(String(255))
-    details = Column(JSON)     # e.g. {"delta": +0.25}
+    details = Column(JsonDoc)     # e.g. {"delta": +0.25}
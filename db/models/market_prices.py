@@ -3,45 +3,54 @@
 from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from core.db import Base
 
+# 4-byte REAL on PostgreSQL (~7 significant digits) is plenty for prices and
+# derived indicators and halves their row width. Volume stays double: share
+# counts above 2**24 would lose integer precision in float4.
+Real = Float(precision=24)
+
 class MarketPrice(Base):
     __tablename__ = "market_prices"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    symbol = Column(String, ForeignKey("instruments.symbol"), nullable=False, index=True)
-    ts = Column(DateTime, nullable=False, index=True)
+    # Indexed only through the composites below (symbol is their leading
+    # column); single-column indexes would just add write amplification
+    symbol = Column(String, ForeignKey("instruments.symbol"), nullable=False)
+    ts = Column(DateTime, nullable=False)
     resolution = Column(String(5), nullable=False)  # '1d','1h','5m'
 
-    open = Column(Float)
-    high = Column(Float)
-    low = Column(Float)
-    close = Column(Float)
+    open = Column(Real)
+    high = Column(Real)
+    low = Column(Real)
+    close = Column(Real)
     volume = Column(Float)
 
     # Existing basic indicators
-    ma20 = Column(Float)
-    ma50 = Column(Float)
-    ath = Column(Float)
+    ma20 = Column(Real)
+    ma50 = Column(Real)
+    ath = Column(Real)
 
     # New indicators (Option A full expansion)
     # Bollinger Bands
-    bb_mid = Column(Float)
-    bb_upper = Column(Float)
-    bb_lower = Column(Float)
+    bb_mid = Column(Real)
+    bb_upper = Column(Real)
+    bb_lower = Column(Real)
 
     # MACD
-    ema_fast = Column(Float)
-    ema_slow = Column(Float)
-    macd = Column(Float)
-    macd_signal = Column(Float)
+    ema_fast = Column(Real)
+    ema_slow = Column(Real)
+    macd = Column(Real)
+    macd_signal = Column(Real)
 
     # ATR + True Range
-    tr = Column(Float)
-    atr = Column(Float)
+    tr = Column(Real)
+    atr = Column(Real)
 
     # Supertrend baseline band
-    supertrend = Column(Float)
+    supertrend = Column(Real)
 
     __table_args__ = (
         Index("idx_symbol_ts_res", "symbol", "ts", "resolution", unique=True),
+        # Range scans for backtests: WHERE symbol=? AND resolution=? AND ts >= ?
+        Index("idx_symbol_res_ts", "symbol", "resolution", "ts"),
     )
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
 from core.db import Base
+from db.models._types import JsonDoc
 
 class SymbolEvent(Base):
     __tablename__ = "symbol_events"
@@ -9,4 +10,4 @@ class SymbolEvent(Base):
     date = Column(DateTime, nullable=False, index=True)
     event_type = Column(String(50))   # earnings, dividend, split, guidance, etc.
     value = Column(Float)
-    details = Column(JSON)
+    details = Column(JsonDoc)
@@ -0,0 +1,23 @@
+# db/models/symbol_indicator_state.py
+
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
+from core.db import Base
+
+class SymbolIndicatorState(Base):
+    """
+    Per (symbol, resolution) watermark for IndicatorService.compute_for:
+    bars up to last_ts already carry stored indicators.
+    """
+    __tablename__ = "symbol_indicator_state"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    symbol = Column(String, ForeignKey("instruments.symbol"), nullable=False)
+    resolution = Column(String(5), nullable=False)
+
+    last_ts = Column(DateTime, nullable=False)
+    last_ath = Column(Float)          # running max close through last_ts
+
+    __table_args__ = (
+        Index("idx_indicator_state_symbol_res", "symbol", "resolution", unique=True),
+    )
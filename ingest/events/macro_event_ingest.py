@@ -30,9 +30,11 @@ class MacroEventIngestor:
         """
         events = list of dicts:
             { "date": datetime, "event_type": "...", "value": 5.25, "description": "...", "details": {} }
+
+        Inserted in one batch and one commit (add_event commits per row).
         """
-        for ev in events:
-            self.add_event(**ev)
+        self.session.bulk_insert_mappings(MarketEvent, list(events))
+        self.session.commit()
 
     def close(self):
         self.session.close()
@@ -26,8 +26,12 @@ class ExternalSignalIngestor:
         self.session.commit()
 
     def bulk_ingest(self, signals):
-        for sig in signals:
-            self.add_signal(**sig)
+        """
+        signals = list of dicts with add_signal's keyword arguments.
+        Inserted in one batch and one commit (add_signal commits per row).
+        """
+        self.session.bulk_insert_mappings(ExternalSignal, list(signals))
+        self.session.commit()
 
     def close(self):
         self.session.close()
@@ -19,26 +19,31 @@ class DatasetBuilder:
         self.session = SessionLocal()
 
     def load_prices(self, symbol, resolution):
-        stmt = select(MarketPrice).where(
+        # Core column select straight into pandas: no ORM objects or
+        # per-row dicts in between
+        columns = [
+            MarketPrice.open,
+            MarketPrice.high,
+            MarketPrice.low,
+            MarketPrice.close,
+            MarketPrice.volume,
+            MarketPrice.ma20,
+            MarketPrice.ma50,
+            MarketPrice.ath,
+        ]
+        stmt = select(MarketPrice.ts, *columns).where(
             MarketPrice.symbol == symbol,
             MarketPrice.resolution == resolution
         ).order_by(MarketPrice.ts.asc())
 
-        rows = self.session.execute(stmt).scalars().all()
-
-        df = pd.DataFrame([{
-            "ts": r.ts,
-            "open": r.open,
-            "high": r.high,
-            "low": r.low,
-            "close": r.close,
-            "volume": r.volume,
-            "ma20": r.ma20,
-            "ma50": r.ma50,
-            "ath": r.ath,
-        } for r in rows]).set_index("ts")
-
-        return df
+        return pd.read_sql_query(
+            stmt,
+            self.session.connection(),
+            index_col="ts",
+            parse_dates=["ts"],
+            # float64 even when a column is all NULL (e.g. before indicators)
+            dtype={col.key: "float64" for col in columns},
+        )
 
     def close(self):
         self.session.close()
@@ -5,22 +5,81 @@ Handles inserting OHLCV rows into the market_prices table.
 
 Features:
  - Correct timestamp normalisation for all IBKR formats
- - UPSERT-style behaviour (update if exists, insert if not)
+ - UPSERT-style behaviour (update if exists, insert if not), as batched
+   INSERT ... ON CONFLICT statements on PostgreSQL / SQLite
+ - PostgreSQL COPY fast path for bulk backfills (copy_dataframe)
+ - IngestWorker: background thread batching several symbols' frames
+   into one transaction
  - Works with IngestionEngine.run()
  - Matches DB schema via MarketPrice ORM
 """
 
+import io
+import queue
+import threading
+import time
 from datetime import datetime, date
+import pandas as pd
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from db.models.market_prices import MarketPrice
 from core.logger_service import get_logger
 
 logger = get_logger("price_ingest")
 
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE support in SQLAlchemy
+_UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+# Rows per upsert statement (8 bind params each; stays under SQLite's limit)
+UPSERT_BATCH_SIZE = 2000
+
+# Staging table for COPY; dropped automatically when the transaction ends.
+_STAGE_DDL = """
+CREATE TEMP TABLE market_prices_stage (
+    symbol VARCHAR NOT NULL,
+    resolution VARCHAR(5) NOT NULL,
+    ts TIMESTAMP NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    volume DOUBLE PRECISION
+) ON COMMIT DROP
+"""
+
+_STAGE_COPY = (
+    "COPY market_prices_stage (symbol, resolution, ts, open, high, low, close, volume) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+# Merge staged rows; (xmax = 0) is true only for freshly inserted tuples.
+_STAGE_MERGE = """
+INSERT INTO market_prices (symbol, resolution, ts, open, high, low, close, volume)
+SELECT symbol, resolution, ts, open, high, low, close, volume FROM market_prices_stage
+ON CONFLICT (symbol, ts, resolution) DO UPDATE SET
+    open = EXCLUDED.open,
+    high = EXCLUDED.high,
+    low = EXCLUDED.low,
+    close = EXCLUDED.close,
+    volume = EXCLUDED.volume
+RETURNING (xmax = 0)
+"""
+
 
 class PriceIngestor:
     def __init__(self, session):
         self.session = session
 
+        # (symbol, resolution) -> earliest ts written by the latest ingest
+        # call, so indicator recompute can rewind to bars updated in place
+        self.touched_from = {}
+
     # ------------------------------------------------------------
     @staticmethod
     def _normalize_timestamp(dt):
@@ -46,21 +105,43 @@ class PriceIngestor:
             dt = dt.replace(tzinfo=None)
 
         return dt
-        
-    def ibkr_ingest(self, symbol, resolution, duration, ibkr_service):
+
+    @classmethod
+    def _normalize_timestamps(cls, col):
         """
-        Fetch historical data using a persistent IBKR service,
-        convert to dataframe, then write to DB + recompute indicators.
+        Column form of _normalize_timestamp: one pandas conversion to naive
+        datetime64, keeping wall-clock time for tz-aware input (the same as
+        replace(tzinfo=None)). Mixed-offset columns that pandas refuses to
+        parse fall back to the per-value path.
         """
+        try:
+            ts = pd.to_datetime(col)
+        except (TypeError, ValueError):
+            return pd.to_datetime(col.map(cls._normalize_timestamp))
+
+        if ts.dt.tz is not None:
+            ts = ts.dt.tz_localize(None)
+        return ts
 
-        # Fetch bars via persistent IBKR
-        bars = ibkr_service.fetch_bars(
+    def ibkr_ingest(self, symbol, resolution, duration, ibkr_service, worker=None):
+        """
+        Fetch historical data using a persistent IBKR service (IBKRFetcher),
+        then write to DB + recompute indicators.
+
+        With an IngestWorker the frame is queued and this returns right
+        after the fetch; the worker does the DB write in the background.
+        """
+
+        # Fetch bars via persistent IBKR (already a DataFrame)
+        df = ibkr_service.fetch_bars(
             symbol=symbol,
             duration=duration,
-            bar_size=resolution
+            barSize=resolution
         )
 
-        df = ibkr_service.bars_to_dataframe(bars, symbol, resolution)
+        if worker is not None:
+            worker.submit(symbol, resolution, df)
+            return {"fetched": len(df), "queued": True}
 
         # Insert into DB
         inserted = self.ingest_dataframe(symbol, df, resolution)
@@ -69,62 +150,256 @@ class PriceIngestor:
         indicator_rows = inserted
 
         return {
-            "fetched": len(bars),
+            "fetched": len(df),
             "inserted": inserted,
             "indicator_rows": indicator_rows,
         }
 
     # ------------------------------------------------------------
-    def ingest_dataframe(self, symbol: str, df, resolution: str) -> int:
+    def copy_dataframe(self, symbol: str, df, resolution: str) -> int:
+        """
+        PostgreSQL-only bulk path: COPY the bars into a temp staging table,
+        then merge with INSERT ... ON CONFLICT so existing bars are updated
+        exactly like ingest_dataframe does. Returns the number of new rows.
+        """
+        frame = self._price_frame(symbol, df, resolution)
+
+        buf = io.StringIO()
+        frame.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+
+        raw = self.session.connection().connection
+        with raw.cursor() as cur:
+            cur.execute(_STAGE_DDL)
+            cur.copy_expert(_STAGE_COPY, buf)
+            cur.execute(_STAGE_MERGE)
+            inserted = sum(1 for (is_new,) in cur.fetchall() if is_new)
+
+        self.session.commit()
+
+        logger.info(
+            f"COPY ingest for {symbol} @ {resolution}: {len(frame)} rows staged, {inserted} new"
+        )
+
+        return inserted
+
+    # ------------------------------------------------------------
+    def _price_frame(self, symbol: str, df, resolution: str):
+        """
+        market_prices-shaped frame (symbol, resolution, ts, OHLCV) with one
+        row per ts, since ON CONFLICT cannot touch the same row twice in
+        one statement. Every write path builds one, so this is also where
+        touched_from is recorded.
+        """
+        ts_col = df["ts"] if "ts" in df.columns else df["date"]
+
+        frame = df[OHLCV_COLUMNS].astype(float)
+        frame.insert(0, "ts", self._normalize_timestamps(ts_col).to_numpy())
+        frame.insert(0, "resolution", resolution)
+        frame.insert(0, "symbol", symbol)
+
+        if len(frame):
+            self.touched_from[(symbol, resolution)] = frame["ts"].min().to_pydatetime()
+
+        return frame.drop_duplicates(subset="ts", keep="last")
+
+    def _price_records(self, symbol: str, df, resolution: str):
+        """_price_frame as a list of column -> plain Python value dicts."""
+        frame = self._price_frame(symbol, df, resolution)
+
+        # Built column-wise, not per pandas cell
+        timestamps = frame["ts"].to_numpy(dtype="datetime64[us]").astype(object).tolist()
+        ohlcv = frame[OHLCV_COLUMNS].to_numpy().tolist()
+        return [
+            dict(zip(OHLCV_COLUMNS, values), symbol=symbol, resolution=resolution, ts=ts)
+            for ts, values in zip(timestamps, ohlcv)
+        ]
+
+    def _existing_count(self, symbol: str, resolution: str, stamps) -> int:
+        """How many of stamps are already stored (SQLite has no xmax)."""
+        return (
+            self.session.query(func.count(MarketPrice.id))
+            .filter(
+                MarketPrice.symbol == symbol,
+                MarketPrice.resolution == resolution,
+                MarketPrice.ts.in_(stamps),
+            )
+            .scalar()
+        )
+
+    # ------------------------------------------------------------
+    def ingest_dataframe(self, symbol: str, df, resolution: str, commit: bool = True) -> int:
         """
         Insert or update OHLCV bars for a given symbol + resolution.
 
         df must include:
          - date (or ts)
          - open, high, low, close, volume
+
+        On PostgreSQL / SQLite this is a handful of multi-row
+        INSERT ... ON CONFLICT (symbol, ts, resolution) DO UPDATE
+        statements; other dialects fall back to a prefetch + bulk path.
+        New rows are counted per statement: RETURNING (xmax = 0) on
+        PostgreSQL (as in copy_dataframe), a lookup of the batch's ts on
+        SQLite.
+
+        commit=False leaves the transaction open so the caller can batch
+        several frames into one commit (see IngestWorker).
         """
+        dialect = self.session.get_bind().dialect.name
+        insert = _UPSERT_INSERTS.get(dialect)
+        if insert is None:
+            return self._ingest_rows(symbol, df, resolution, commit)
+
+        records = self._price_records(symbol, df, resolution)
 
         inserted = 0
+        for start in range(0, len(records), UPSERT_BATCH_SIZE):
+            batch = records[start:start + UPSERT_BATCH_SIZE]
+            stmt = insert(MarketPrice).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["symbol", "ts", "resolution"],
+                set_={col: stmt.excluded[col] for col in OHLCV_COLUMNS},
+            )
+
+            if dialect == "postgresql":
+                # (xmax = 0) is true only for freshly inserted tuples
+                result = self.session.execute(stmt.returning(literal_column("(xmax = 0)")))
+                inserted += sum(1 for (is_new,) in result if is_new)
+            else:
+                stamps = [rec["ts"] for rec in batch]
+                inserted += len(batch) - self._existing_count(symbol, resolution, stamps)
+                self.session.execute(stmt)
 
-        for _, row in df.iterrows():
+        if commit:
+            self.session.commit()
 
-            # IBKR returns `date`; DB uses `ts`
-            ts = row.get("ts") or row.get("date")
-            ts = self._normalize_timestamp(ts)
+        logger.info(
+            f"Upserted {len(records)} rows for {symbol} @ {resolution}: {inserted} new"
+        )
+
+        return inserted
 
-            # Check if row exists
-            existing = (
-                self.session.query(MarketPrice)
-                .filter_by(symbol=symbol, ts=ts, resolution=resolution)
-                .first()
+    def _ingest_rows(self, symbol: str, df, resolution: str, commit: bool = True) -> int:
+        """
+        Upsert for dialects without ON CONFLICT: one query prefetches the
+        ids of bars already stored in the batch's ts range, then new and
+        existing bars go out as one bulk insert and one bulk update.
+        """
+        records = self._price_records(symbol, df, resolution)
+        if not records:
+            return 0
+
+        stamps = [rec["ts"] for rec in records]
+        existing = dict(
+            self.session.query(MarketPrice.ts, MarketPrice.id)
+            .filter(
+                MarketPrice.symbol == symbol,
+                MarketPrice.resolution == resolution,
+                MarketPrice.ts.between(min(stamps), max(stamps)),
             )
+            .all()
+        )
 
-            if existing:
-                # Update existing OHLCV
-                existing.open = float(row["open"])
-                existing.high = float(row["high"])
-                existing.low = float(row["low"])
-                existing.close = float(row["close"])
-                existing.volume = float(row["volume"])
+        to_insert, to_update = [], []
+        for rec in records:
+            row_id = existing.get(rec["ts"])
+            if row_id is None:
+                to_insert.append(rec)
             else:
-                # Insert new row
-                candle = MarketPrice(
-                    symbol=symbol,
-                    ts=ts,
-                    resolution=resolution,
-                    open=float(row["open"]),
-                    high=float(row["high"]),
-                    low=float(row["low"]),
-                    close=float(row["close"]),
-                    volume=float(row["volume"]),
-                )
-                self.session.add(candle)
-                inserted += 1
+                to_update.append(dict(rec, id=row_id))
 
-        self.session.commit()
+        self.session.bulk_insert_mappings(MarketPrice, to_insert)
+        self.session.bulk_update_mappings(MarketPrice, to_update)
+        if commit:
+            self.session.commit()
 
+        inserted = len(to_insert)
         logger.info(
             f"Inserted/updated rows for {symbol} @ {resolution}: {inserted}"
         )
 
         return inserted
+
+
+# ----------------------------------------------------------------
+class IngestWorker(threading.Thread):
+    """
+    Background writer for fetched bars.
+
+    Producers call submit(symbol, resolution, df) and return immediately;
+    the worker collects frames for up to max_wait seconds (or max_batch
+    frames) and upserts them on its own long-lived session with a single
+    commit per batch. Call stop() to flush what is queued and join.
+
+    results maps (symbol, resolution) -> new rows, or {"error": msg} when
+    the batch containing that frame failed (the batch is rolled back).
+    """
+
+    _STOP = object()
+
+    def __init__(self, session_factory, max_batch: int = 50, max_wait: float = 0.5):
+        super().__init__(name="ingest-worker", daemon=True)
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.results = {}
+        self._queue = queue.Queue()
+
+    def submit(self, symbol: str, resolution: str, df):
+        self._queue.put((symbol, resolution, df))
+
+    def stop(self):
+        self._queue.put(self._STOP)
+        self.join()
+
+    # ------------------------------------------------------------
+    def run(self):
+        session = self.session_factory()
+        ingestor = PriceIngestor(session)
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+
+                batch = [item]
+                deadline = time.monotonic() + self.max_wait
+                while len(batch) < self.max_batch:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                self._flush(session, ingestor, batch)
+        finally:
+            session.close()
+
+    def _flush(self, session, ingestor, batch):
+        try:
+            counts = [
+                ingestor.ingest_dataframe(symbol, df, resolution, commit=False)
+                for symbol, resolution, df in batch
+            ]
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Ingest batch of {len(batch)} frames failed: {e}")
+            for symbol, resolution, _ in batch:
+                self.results[(symbol, resolution)] = {"error": str(e)}
+            return
+
+        for (symbol, resolution, _), inserted in zip(batch, counts):
+            self.results[(symbol, resolution)] = inserted
+
+        logger.info(
+            f"Ingest worker committed {len(batch)} frames, {sum(counts)} new rows"
+        )
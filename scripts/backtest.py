@@ -1,10 +1,7 @@
 # scripts/backtest.py
 
+import sys
 import argparse
-from core.backtest_runner import BacktestRunner
-from core.logger_service import get_logger
-
-logger = get_logger("script_backtest")
 
 
 def main():
@@ -28,6 +25,12 @@ def main():
 
     args = parser.parse_args()
 
+    # Heavy imports (pandas, SQLAlchemy, strategies) only once the
+    # arguments are valid, so --help and usage errors return immediately
+    from core.backtest_runner import BacktestRunner, cagr
+    from core.logger_service import get_logger
+
+    logger = get_logger("script_backtest")
     logger.info(
         f"CLI backtest requested: symbol={args.symbol}, resolution={args.resolution}, "
         f"strategy={args.strategy}, auto_fetch={args.auto_fetch}, "
@@ -46,34 +49,73 @@ def main():
 
     result = runner.run()
 
-    print("\nBacktest summary")
-    print("----------------")
-    print(f"Symbol:        {args.symbol}")
-    print(f"Resolution:    {args.resolution}")
-    print(f"Strategy:      {args.strategy}")
-    print(f"Bars:          {result['bars']}\n")
-
-    print("Performance vs Buy & Hold")
-    print("-------------------------")
-    print(f"Strategy Return:   {result['total_return']*100:.2f}%")
-    print(f"Buy & Hold Return: {result['buyhold_return']*100:.2f}%")
-    print(f"Δ Return:          {(result['total_return']-result['buyhold_return'])*100:.2f}%\n")
-
-    print(f"Strategy CAGR:     {result['total_return']*100:.2f}%")
-    print(f"Buy & Hold CAGR:   {result['buyhold_return']*100:.2f}%")
-    print(f"Δ CAGR:            {(result['total_return']-result['buyhold_return'])*100:.2f}%\n")
-
-    print(f"Strategy Sharpe:   {result['sharpe']:.2f}")
-    print(f"Buy & Hold Sharpe: {result['buyhold_sharpe']:.2f}")
-    print(f"Δ Sharpe:          {result['sharpe']-result['buyhold_sharpe']:.2f}\n")
-
-    print(f"Strategy Max DD:   {result['max_dd']*100:.2f}%")
-    print(f"Buy & Hold Max DD: {result['buyhold_dd']*100:.2f}%")
-    print(f"Δ Max DD:          {(result['max_dd']-result['buyhold_dd'])*100:.2f}%\n")
-
-    if args.plot:
-        print("Plot saved to: data/plots/")
-
+    def as_pct(x):
+        return f"{x*100:.2f}%"
+
+    def rows(pairs):
+        # Labels padded to one width so every value starts in the same column
+        return [f"{label + ':':<20}{value}" for label, value in pairs]
+
+    def heading(title):
+        return [title, "-" * len(title)]
+
+    tr, bh = result["total_return"], result["buyhold_return"]
+    cagr_s = cagr(tr, result["years"])
+    cagr_b = cagr(bh, result["years"])
+    sharpe_s, sharpe_b = result["sharpe"], result["buyhold_sharpe"]
+    sortino_s, sortino_b = result["sortino"], result["buyhold_sortino"]
+    dd_s, dd_b = result["max_dd"], result["buyhold_dd"]
+
+    plot_line = "Plot saved to: data/plots/\n" if args.plot else ""
+
+    # One template, one write
+    lines = [
+        "",
+        *heading("Backtest summary"),
+        *rows([
+            ("Symbol", args.symbol),
+            ("Resolution", args.resolution),
+            ("Strategy", args.strategy),
+            ("Bars", result["bars"]),
+            ("Years", f"{result['years']:.2f}"),
+        ]),
+        "",
+        *heading("Performance vs Buy & Hold"),
+        *rows([
+            ("Strategy Return", as_pct(tr)),
+            ("Buy & Hold Return", as_pct(bh)),
+            ("Δ Return", as_pct(tr - bh)),
+        ]),
+        "",
+        *rows([
+            ("Strategy CAGR", as_pct(cagr_s)),
+            ("Buy & Hold CAGR", as_pct(cagr_b)),
+            ("Δ CAGR", as_pct(cagr_s - cagr_b)),
+        ]),
+        "",
+        *rows([
+            ("Strategy Sharpe", f"{sharpe_s:.2f}"),
+            ("Buy & Hold Sharpe", f"{sharpe_b:.2f}"),
+            ("Δ Sharpe", f"{sharpe_s - sharpe_b:.2f}"),
+        ]),
+        "",
+        *rows([
+            ("Strategy Sortino", f"{sortino_s:.2f}"),
+            ("Buy & Hold Sortino", f"{sortino_b:.2f}"),
+            ("Δ Sortino", f"{sortino_s - sortino_b:.2f}"),
+        ]),
+        "",
+        *rows([
+            ("Strategy Max DD", as_pct(dd_s)),
+            ("Buy & Hold Max DD", as_pct(dd_b)),
+            ("Δ Max DD", as_pct(dd_s - dd_b)),
+        ]),
+        "",
+        "",
+    ]
+    summary = "\n".join(lines)
+    sys.stdout.write(summary + plot_line)
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,15 @@
 #!/usr/bin/env python3
 import argparse
-from core.trade_service import cancel_order
-# you would pass in an existing trade object or order ID here (expand later)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cancel an open IBKR order")
+    parser.add_argument("--order-id", type=int, required=True, help="orderId of an open order")
+    args = parser.parse_args()
+
+    # ib_insync and the IBKR services load only once arguments are valid
+    from core.ibkr_service import ib_session
+    from core.trade_service import cancel_order
+
+    with ib_session():
+        trade = cancel_order(args.order_id)
+        print(f"Final status: {trade.orderStatus.status}")
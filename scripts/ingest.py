@@ -10,10 +10,12 @@ Examples:
 
     # Positional form also supported
     python -m scripts.ingest AAPL 1h "1 Y"
+
+    # Several symbols (comma-separated) are fetched and stored concurrently
+    python -m scripts.ingest -s AAPL,MSFT,NVDA -r 1d -d "5 Y"
 """
 
 import argparse
-from core.ingest_engine import IngestionEngine
 
 
 def main():
@@ -74,8 +76,26 @@ def main():
             "Example: python -m scripts.ingest -s AAPL -r 1h -d '1 Y'"
         )
 
+    symbols = [s.strip() for s in symbol.split(",") if s.strip()]
+
+    # Imported only after argument validation: it pulls in pandas,
+    # SQLAlchemy and ib_insync, which --help and usage errors don't need
+    from core.ingest_engine import IngestionEngine
+
     engine = IngestionEngine()
-    result = engine.run(symbol, resolution, duration)
+
+    if len(symbols) > 1:
+        results = engine.run_many(symbols, resolution, duration)
+        engine.close()
+
+        print("Ingestion complete:")
+        for sym, result in results.items():
+            print(f"  {sym}:")
+            for k, v in result.items():
+                print(f"    {k}: {v}")
+        return
+
+    result = engine.run(symbols[0], resolution, duration)
 
     # Simple stdout summary
     print("Ingestion complete:")
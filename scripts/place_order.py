@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import argparse
-from core.trade_service import place_market_order
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Place a market order via IBKR")
@@ -9,5 +8,10 @@ if __name__ == "__main__":
     parser.add_argument("--quantity", type=int, default=1, help="Number of shares (default: 1)")
     args = parser.parse_args()
 
-    trade = place_market_order(args.symbol, args.action, quantity=args.quantity)
-    print(f"Final status: {trade.orderStatus.status}")
+    # ib_insync and the IBKR services load only once arguments are valid
+    from core.ibkr_service import ib_session
+    from core.trade_service import place_market_order
+
+    with ib_session():
+        trade = place_market_order(args.symbol, args.action, quantity=args.quantity)
+        print(f"Final status: {trade.orderStatus.status}")
@@ -10,15 +10,23 @@ Usage:
     python -m scripts.test_db_connection
 """
 
+from sqlalchemy import select, func
 from core.db import SessionLocal
 from db.models import HealthCheck
 
 
 def main():
     with SessionLocal() as session:
-        # fetch all rows
-        rows = session.query(HealthCheck).all()
-        print(f"HealthCheck rows in DB: {len(rows)}")
+        count = session.scalar(select(func.count()).select_from(HealthCheck))
+        print(f"HealthCheck rows in DB: {count}")
+
+        # Stream plain column tuples (server-side cursor on Postgres)
+        # instead of loading every row as an ORM object first
+        rows = session.execute(
+            select(HealthCheck.id, HealthCheck.note, HealthCheck.created_at)
+            .order_by(HealthCheck.id)
+            .execution_options(yield_per=1000)
+        )
         for r in rows:
             print(f" - id={r.id}, note={r.note}, created_at={r.created_at}")
 
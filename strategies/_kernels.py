@@ -0,0 +1,53 @@
+# strategies/_kernels.py
+"""
+Shared numeric kernels for vectorised strategy signals.
+"""
+
+import numpy as np
+from core._njit import njit, HAVE_NUMBA
+
+
+@njit(cache=True)
+def _cross_signals_loop(short, long):
+    n = short.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    prev = -1  # -1 until the first valid bar, then 0/1 for short <= / > long
+
+    for i in range(n):
+        s = short[i]
+        l = long[i]
+        if s != s or l != l:  # NaN: skip without touching prev
+            continue
+
+        cur = 1 if s > l else 0
+        if prev != -1 and cur != prev:
+            out[i] = 1 if cur == 1 else -1
+        prev = cur
+
+    return out
+
+
+def _cross_signals_numpy(short, long):
+    valid = np.flatnonzero(~(np.isnan(short) | np.isnan(long)))
+    state = (short[valid] > long[valid]).astype(np.int8)
+
+    out = np.zeros(short.shape[0], dtype=np.int8)
+    out[valid[1:]] = np.diff(state)
+    return out
+
+
+def cross_signals(short, long) -> np.ndarray:
+    """
+    +1 where `short` crosses above `long`, -1 where it crosses below, 0
+    otherwise. Crosses are measured between consecutive bars on which both
+    inputs are valid (NaN bars are skipped), matching the on_bar loops.
+
+    Runs as a single fused Numba pass when numba is available, otherwise as
+    an equivalent NumPy expression.
+    """
+    short = np.ascontiguousarray(short, dtype=np.float64)
+    long = np.ascontiguousarray(long, dtype=np.float64)
+
+    if HAVE_NUMBA:
+        return _cross_signals_loop(short, long)
+    return _cross_signals_numpy(short, long)
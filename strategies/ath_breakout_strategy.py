@@ -1,12 +1,37 @@
 # strategies/ath_breakout_strategy.py
 
-import pandas as pd
+import logging
+import numpy as np
 from strategies.base import Strategy
+from core._njit import njit
 from core.logger_service import get_logger
 
 logger = get_logger("ath_breakout_strategy")
 
 
+@njit(cache=True)
+def _breakout_signals_loop(close, ath, breakout_buffer, stop_buffer):
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    in_position = False
+
+    for i in range(1, n):
+        price = close[i]
+        cur_ath = ath[i]
+        prev_ath = ath[i - 1]
+        if price != price or cur_ath != cur_ath or prev_ath != prev_ath:  # NaN
+            continue
+
+        if not in_position and price > prev_ath * (1.0 + breakout_buffer):
+            in_position = True
+            out[i] = 1
+        elif in_position and price < cur_ath * (1.0 - stop_buffer):
+            in_position = False
+            out[i] = -1
+
+    return out
+
+
 class ATHBreakoutStrategy(Strategy):
     """
     All-Time-High breakout strategy.
@@ -26,23 +51,55 @@ class ATHBreakoutStrategy(Strategy):
         self.breakout_buffer = breakout_buffer
         self.stop_buffer = stop_buffer
         self.in_position = False
+        self._bound_df = None
+        self._close = None
+        self._ath = None
 
-    def on_bar(self, i, row, df):
+    def compute_signals(self, df):
         if "ath" not in df.columns or "close" not in df.columns:
+            return np.zeros(len(df), dtype=np.int8)
+
+        # The in-position state makes this inherently sequential: one
+        # compiled pass over the two arrays instead of on_bar per row
+        return _breakout_signals_loop(
+            df["close"].to_numpy(dtype=np.float64),
+            df["ath"].to_numpy(dtype=np.float64),
+            float(self.breakout_buffer),
+            float(self.stop_buffer),
+        )
+
+    def reset(self):
+        self.in_position = False
+
+    def on_start(self, df):
+        # Bind close / ath once so on_bar indexes arrays instead of df.loc
+        self._bound_df = df
+        self.reset()
+        if "ath" in df.columns and "close" in df.columns:
+            self._close = df["close"].to_numpy(dtype=np.float64)
+            self._ath = df["ath"].to_numpy(dtype=np.float64)
+        else:
+            self._close = self._ath = None
+
+    def on_bar(self, i, row, df):
+        if df is not self._bound_df:
+            self.on_start(df)
+
+        if self._ath is None:
             return None
 
-        price = row["close"]
-        ath = row["ath"]
+        price = self._close[i]
+        ath = self._ath[i]
 
-        if pd.isna(price) or pd.isna(ath):
+        if price != price or ath != ath:  # NaN
             return None
 
         # get previous ATH for breakout detection
         if i == 0:
             return None
 
-        prev_ath = df.loc[i - 1, "ath"]
-        if pd.isna(prev_ath):
+        prev_ath = self._ath[i - 1]
+        if prev_ath != prev_ath:
             return None
 
         signal = None
@@ -51,16 +108,18 @@ class ATHBreakoutStrategy(Strategy):
         if (not self.in_position) and price > prev_ath * (1.0 + self.breakout_buffer):
             self.in_position = True
             signal = "BUY"
-            logger.info(
-                f"{row['date'].date()} ATH breakout BUY — close={price:.2f}, prev_ath={prev_ath:.2f}"
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    f"{row['date'].date()} ATH breakout BUY — close={price:.2f}, prev_ath={prev_ath:.2f}"
+                )
 
         # SELL: stop if price falls sufficiently below current ATH
         elif self.in_position and price < ath * (1.0 - self.stop_buffer):
             self.in_position = False
             signal = "SELL"
-            logger.info(
-                f"{row['date'].date()} ATH stop SELL — close={price:.2f}, ath={ath:.2f}"
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    f"{row['date'].date()} ATH stop SELL — close={price:.2f}, ath={ath:.2f}"
+                )
 
         return signal
@@ -11,15 +11,41 @@ class Strategy:
 
     BacktestRunner expects:
       - on_bar(i, row, df) -> "BUY" | "SELL" | None
+
+    `row` is a dict of column -> value for bar i; `df` is the full frame.
+
+    Strategies whose logic can be expressed over whole columns may also
+    implement compute_signals(df), which BacktestRunner prefers over the
+    per-bar loop.
     """
 
-    def on_start(self, df):
+    def reset(self):
         """
-        Optional hook called before the backtest loop.
-        Not currently used by BacktestRunner, but available.
+        Clear per-run trading state (e.g. the previous bar's crossover
+        state) so one instance can be reused across backtests or
+        parameter sweeps without being re-created.
         """
         pass
 
+    def on_start(self, df):
+        """
+        Optional hook called by BacktestRunner once before the per-bar
+        on_bar loop. Use it to reset() and bind columns as NumPy arrays.
+        """
+        self.reset()
+
+    def compute_signals(self, df):
+        """
+        Optional vectorised alternative to on_bar.
+
+        Return an int8 NumPy array aligned with df where:
+          +1 = BUY, -1 = SELL, 0 = no signal
+
+        Returning None (the default) makes BacktestRunner fall back to
+        calling on_bar for every row.
+        """
+        return None
+
     def on_bar(self, i, row, df):
         """
         Must be implemented by subclasses.
@@ -1,6 +1,7 @@
 # strategies/bollinger_strategy.py
 
-import pandas as pd
+import logging
+import numpy as np
 from strategies.base import Strategy
 from core.logger_service import get_logger
 
@@ -22,28 +23,58 @@ class BollingerStrategy(Strategy):
     """
 
     def __init__(self):
-        pass
+        self._bound_df = None
+        self._bands = None
 
-    def on_bar(self, i, row, df):
+    def compute_signals(self, df):
         required = ["close", "bb_lower", "bb_upper"]
         if any(col not in df.columns for col in required):
+            return np.zeros(len(df), dtype=np.int8)
+
+        price = df["close"].to_numpy(dtype=np.float64)
+        lower = df["bb_lower"].to_numpy(dtype=np.float64)
+        upper = df["bb_upper"].to_numpy(dtype=np.float64)
+
+        # Stateless, so no loop: NaN bars compare False on both sides
+        signals = np.zeros(len(df), dtype=np.int8)
+        signals[price > upper] = -1
+        signals[price < lower] = 1
+        return signals
+
+    def on_start(self, df):
+        # Bind close / bands once so on_bar reads floats, not row lookups
+        self._bound_df = df
+        required = ["close", "bb_lower", "bb_upper"]
+        if all(col in df.columns for col in required):
+            self._bands = tuple(df[col].to_numpy(dtype=np.float64) for col in required)
+        else:
+            self._bands = None
+
+    def on_bar(self, i, row, df):
+        if df is not self._bound_df:
+            self.on_start(df)
+
+        if self._bands is None:
             return None
 
-        price = row["close"]
-        lower = row["bb_lower"]
-        upper = row["bb_upper"]
+        close, bb_lower, bb_upper = self._bands
+        price = close[i]
+        lower = bb_lower[i]
+        upper = bb_upper[i]
 
-        if pd.isna(price) or pd.isna(lower) or pd.isna(upper):
+        if price != price or lower != lower or upper != upper:  # NaN
             return None
 
         # Mean reversion: buy when price pierces lower band,
         # sell when price pierces upper band.
         if price < lower:
-            logger.info(f"{row['date'].date()} Bollinger BUY — close={price:.2f} < lower={lower:.2f}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"{row['date'].date()} Bollinger BUY — close={price:.2f} < lower={lower:.2f}")
             return "BUY"
 
         if price > upper:
-            logger.info(f"{row['date'].date()} Bollinger SELL — close={price:.2f} > upper={upper:.2f}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"{row['date'].date()} Bollinger SELL — close={price:.2f} > upper={upper:.2f}")
             return "SELL"
 
         return None
@@ -1,7 +1,9 @@
 # strategies/db_ma_cross_strategy.py
 
-import pandas as pd
+import logging
+import numpy as np
 from strategies.base import Strategy
+from strategies._kernels import cross_signals
 from core.logger_service import get_logger
 
 logger = get_logger("db_ma_cross_strategy")
@@ -24,15 +26,40 @@ class DbMaCrossStrategy(Strategy):
         self.short_col = short_col
         self.long_col = long_col
         self.prev_state = None
+        self._bound_df = None
+        self._short = None
+        self._long = None
 
-    def on_bar(self, i, row, df):
+    def compute_signals(self, df):
         if self.short_col not in df.columns or self.long_col not in df.columns:
+            return np.zeros(len(df), dtype=np.int8)
+
+        return cross_signals(df[self.short_col].to_numpy(), df[self.long_col].to_numpy())
+
+    def reset(self):
+        self.prev_state = None
+
+    def on_start(self, df):
+        # Bind the MA columns once so on_bar reads floats, not Series
+        self._bound_df = df
+        self.reset()
+        if self.short_col in df.columns and self.long_col in df.columns:
+            self._short = df[self.short_col].to_numpy(dtype=np.float64)
+            self._long = df[self.long_col].to_numpy(dtype=np.float64)
+        else:
+            self._short = self._long = None
+
+    def on_bar(self, i, row, df):
+        if df is not self._bound_df:
+            self.on_start(df)
+
+        if self._short is None:
             return None
 
-        short = row[self.short_col]
-        long = row[self.long_col]
+        short = self._short[i]
+        long = self._long[i]
 
-        if pd.isna(short) or pd.isna(long):
+        if short != short or long != long:  # NaN
             return None
 
         curr_state = short > long
@@ -41,10 +68,12 @@ class DbMaCrossStrategy(Strategy):
         if self.prev_state is not None:
             if curr_state and not self.prev_state:
                 signal = "BUY"
-                logger.info(f"{row['date'].date()} DB-MA golden cross BUY")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"{row['date'].date()} DB-MA golden cross BUY")
             elif not curr_state and self.prev_state:
                 signal = "SELL"
-                logger.info(f"{row['date'].date()} DB-MA death cross SELL")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"{row['date'].date()} DB-MA death cross SELL")
 
         self.prev_state = curr_state
         return signal
@@ -1,7 +1,9 @@
 # strategies/macd_strategy.py
 
-import pandas as pd
+import logging
+import numpy as np
 from strategies.base import Strategy
+from strategies._kernels import cross_signals
 from core.logger_service import get_logger
 
 logger = get_logger("macd_strategy")
@@ -22,15 +24,40 @@ class MACDStrategy(Strategy):
 
     def __init__(self):
         self.prev_state = None  # True if macd > macd_signal last bar
+        self._bound_df = None
+        self._macd = None
+        self._signal = None
 
-    def on_bar(self, i, row, df):
+    def compute_signals(self, df):
         if "macd" not in df.columns or "macd_signal" not in df.columns:
+            return np.zeros(len(df), dtype=np.int8)
+
+        return cross_signals(df["macd"].to_numpy(), df["macd_signal"].to_numpy())
+
+    def reset(self):
+        self.prev_state = None
+
+    def on_start(self, df):
+        # Bind the MACD columns once so on_bar reads floats, not row lookups
+        self._bound_df = df
+        self.reset()
+        if "macd" in df.columns and "macd_signal" in df.columns:
+            self._macd = df["macd"].to_numpy(dtype=np.float64)
+            self._signal = df["macd_signal"].to_numpy(dtype=np.float64)
+        else:
+            self._macd = self._signal = None
+
+    def on_bar(self, i, row, df):
+        if df is not self._bound_df:
+            self.on_start(df)
+
+        if self._macd is None:
             return None
 
-        macd = row["macd"]
-        sig = row["macd_signal"]
+        macd = self._macd[i]
+        sig = self._signal[i]
 
-        if pd.isna(macd) or pd.isna(sig):
+        if macd != macd or sig != sig:  # NaN
             return None
 
         curr_state = macd > sig
@@ -39,10 +66,12 @@ class MACDStrategy(Strategy):
         if self.prev_state is not None:
             if curr_state and not self.prev_state:
                 signal = "BUY"
-                logger.info(f"{row['date'].date()} MACD BUY — macd={macd:.4f}, signal={sig:.4f}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"{row['date'].date()} MACD BUY — macd={macd:.4f}, signal={sig:.4f}")
             elif not curr_state and self.prev_state:
                 signal = "SELL"
-                logger.info(f"{row['date'].date()} MACD SELL — macd={macd:.4f}, signal={sig:.4f}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"{row['date'].date()} MACD SELL — macd={macd:.4f}, signal={sig:.4f}")
 
         self.prev_state = curr_state
         return signal
@@ -1,22 +1,18 @@
 # strategies/registry.py
 
-from strategies.ma_cross_strategy import MaCrossStrategy
-from strategies.rsi_strategy import RSIStrategy
-from strategies.bollinger_strategy import BollingerStrategy
-from strategies.macd_strategy import MACDStrategy
-from strategies.supertrend_strategy import SupertrendStrategy
-from strategies.ath_breakout_strategy import ATHBreakoutStrategy
-from strategies.db_ma_cross_strategy import DbMaCrossStrategy
+import importlib
 
 
+# name -> (module, class); modules are imported on first use only, so
+# loading one strategy doesn't pull in every other strategy module
 STRATEGIES = {
-    "ma_cross": MaCrossStrategy,
-    "rsi": RSIStrategy,
-    "bollinger": BollingerStrategy,
-    "macd": MACDStrategy,
-    "supertrend": SupertrendStrategy,
-    "ath_breakout": ATHBreakoutStrategy,
-    "db_ma_cross": DbMaCrossStrategy,
+    "ma_cross": ("strategies.ma_cross_strategy", "MaCrossStrategy"),
+    "rsi": ("strategies.rsi_strategy", "RSIStrategy"),
+    "bollinger": ("strategies.bollinger_strategy", "BollingerStrategy"),
+    "macd": ("strategies.macd_strategy", "MACDStrategy"),
+    "supertrend": ("strategies.supertrend_strategy", "SupertrendStrategy"),
+    "ath_breakout": ("strategies.ath_breakout_strategy", "ATHBreakoutStrategy"),
+    "db_ma_cross": ("strategies.db_ma_cross_strategy", "DbMaCrossStrategy"),
 }
 
 
@@ -24,4 +20,5 @@ def load_strategy(name: str, **kwargs):
     name = name.lower()
     if name not in STRATEGIES:
         raise ValueError(f"Unknown strategy: {name}")
-    return STRATEGIES[name](**kwargs)
+    module, cls = STRATEGIES[name]
+    return getattr(importlib.import_module(module), cls)(**kwargs)
@@ -1,6 +1,7 @@
 # strategies/rsi_strategy.py
 
-import pandas as pd
+import logging
+import numpy as np
 from strategies.base import Strategy
 from core.logger_service import get_logger
 
@@ -22,21 +23,45 @@ class RSIStrategy(Strategy):
     def __init__(self, lower: float = 30.0, upper: float = 70.0):
         self.lower = lower
         self.upper = upper
+        self._bound_df = None
+        self._rsi = None
 
-    def on_bar(self, i, row, df):
+    def compute_signals(self, df):
         if "rsi" not in df.columns:
+            return np.zeros(len(df), dtype=np.int8)
+
+        rsi = df["rsi"].to_numpy(dtype=np.float64)
+
+        # NaN compares False, so missing RSI bars stay 0; BUY is applied
+        # last so it wins if the thresholds overlap, as in on_bar
+        signals = np.zeros(len(rsi), dtype=np.int8)
+        signals[rsi > self.upper] = -1
+        signals[rsi < self.lower] = 1
+        return signals
+
+    def on_start(self, df):
+        self._bound_df = df
+        self._rsi = df["rsi"].to_numpy(dtype=np.float64) if "rsi" in df.columns else None
+
+    def on_bar(self, i, row, df):
+        if df is not self._bound_df:
+            self.on_start(df)
+
+        if self._rsi is None:
             return None
 
-        rsi = row["rsi"]
-        if pd.isna(rsi):
+        rsi = self._rsi[i]
+        if rsi != rsi:  # NaN
             return None
 
         if rsi < self.lower:
-            logger.info(f"{row['date'].date()} RSI BUY — rsi={rsi:.1f}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"{row['date'].date()} RSI BUY — rsi={rsi:.1f}")
             return "BUY"
 
         if rsi > self.upper:
-            logger.info(f"{row['date'].date()} RSI SELL — rsi={rsi:.1f}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"{row['date'].date()} RSI SELL — rsi={rsi:.1f}")
             return "SELL"
 
         return None
@@ -1,30 +1,66 @@
 # strategies/supertrend_strategy.py
 
+import logging
+import numpy as np
 from strategies.base import Strategy
 from core.logger_service import get_logger
 
 logger = get_logger("supertrend_strategy")
 
 
+def _trend_array(df):
+    """supertrend_trend as int8 (+1 / -1, 0 where missing)."""
+    return df["supertrend_trend"].to_numpy(dtype=np.int8, na_value=0)
+
+
 class SupertrendStrategy(Strategy):
 
+    def __init__(self):
+        self._bound_df = None
+        self._trend = None
+
+    def compute_signals(self, df):
+        signals = np.zeros(len(df), dtype=np.int8)
+        if "supertrend_trend" not in df.columns or len(df) < 2:
+            return signals
+
+        # A flip is a step of ±2 between consecutive bars; steps to or
+        # from a missing (0) bar are only ±1 and never signal
+        trend = _trend_array(df)
+        step = np.subtract(trend[1:], trend[:-1], dtype=np.int8)
+        signals[1:][step == 2] = 1
+        signals[1:][step == -2] = -1
+        return signals
+
+    def on_start(self, df):
+        # Bind the trend column once so on_bar never builds df.iloc rows
+        self._bound_df = df
+        if "supertrend_trend" in df.columns:
+            self._trend = _trend_array(df)
+        else:
+            self._trend = None
+
     def on_bar(self, i, row, df):
-        trend = row.get("supertrend_trend")
+        if df is not self._bound_df:
+            self.on_start(df)
 
         # Not enough data yet
-        if trend is None or i == 0:
+        if self._trend is None or i == 0:
             return None
 
-        prev_trend = df.iloc[i - 1].get("supertrend_trend")
+        trend = self._trend[i]
+        prev_trend = self._trend[i - 1]
 
         # BUY on trend flip upward
         if prev_trend == -1 and trend == 1:
-            logger.info(f"{row['date'].date()} SuperTrend BUY — trend flipped UP")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"{row['date'].date()} SuperTrend BUY — trend flipped UP")
             return "BUY"
 
         # SELL on trend flip downward
         if prev_trend == 1 and trend == -1:
-            logger.info(f"{row['date'].date()} SuperTrend SELL — trend flipped DOWN")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"{row['date'].date()} SuperTrend SELL — trend flipped DOWN")
             return "SELL"
 
         return None